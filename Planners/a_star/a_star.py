@@ -1,119 +1,103 @@
+import heapq
 import math
 import numpy as np
 
+ROOT_2 = math.sqrt(2)
+
+# [dx, dy, cost] of the 8-connected moves
+MOTIONS = [[1, 0, 1], [0, 1, 1], [-1, 0, 1], [0, -1, 1],
+           [-1, -1, ROOT_2], [-1, 1, ROOT_2], [1, -1, ROOT_2], [1, 1, ROOT_2]]
+
 
 class AStarPlanner:
-    # initaite the class with parameters of image matrix, start position, end position, resolution of matrix [x,y]
-    def __init__(self,matrix):
-        self.matrix = matrix
-        self.min_x = 0
-        self.max_x = len(matrix)
-        self.min_y = 0
-        self.max_y = len(matrix[0])
-
-    # Node -> cell in matrix with fields of point -> [x,y], g,h,f,parent_node
-    class Node:
-        def __init__(self,point,grid_position,heuristic,parent_node):
-            self.point = point
-            self.grid_position = grid_position
-            self.heuristic = heuristic
-            self.cost = self.grid_position + self.heuristic
-            self.parent_node = parent_node
-
-        def __str__(self):
-            return str(self.point[0])+","+str(self.point[1])+","+str(self.parent_node)
-
-    # verifiying node is in matrix and non-obstacle
-    def verifyNode(self,node_point):
-        px = node_point//(self.max_x)
-        py = node_point%(self.max_x)
-
-        if px < self.min_x :
-            return False
-        elif py < self.min_y:
-            return False
-        elif px >= self.max_x:
-            return False
-        elif py >= self.max_y:
-            return False
-
-        if self.matrix[px][py] != 255:
-            return False
-
-        return True
-
-    # calculating the grid position from start node
-    def calc_grid_position(self,node_point,):
-        return (abs(self.start_index[0]-node_point[0]) + abs(self.start_index[1]-node_point[1]))
-
-    # calculating the heuristic estimated from goal node
-    def calc_heuristic(self,node_point):
-        return (abs(self.goal_index[0]-node_point[0]) + abs(self.goal_index[1]-node_point[1]))
-
-    # xy_index
-    def calc_xy_index(self,node_point):
-        return ((node_point[1]*(self.max_x))+node_point[0])
-
-    # total path planning algorithm
-    def get_path(self,start_index,goal_index):
+    """
+    A* planner over the 8-connected grid of free (non-zero) map cells.
+
+    The open set is a binary heap with lazy deletion and the g-scores, parents
+    and closed flags are flat NumPy arrays indexed by ``y*W+x``.
+    Points are given and returned as [x, y].
+    """
+
+    def __init__(self, matrix):
+        self.matrix = np.asarray(matrix)
+        self.height, self.width = self.matrix.shape
+        self.free = np.ascontiguousarray(self.matrix != 0).ravel()
+
+    # octile distance, admissible and consistent for unit straight and sqrt(2) diagonal moves
+    def calc_heuristic(self, x, y):
+        dx = abs(x - self.goal_index[0])
+        dy = abs(y - self.goal_index[1])
+        return dx + dy + (ROOT_2 - 2) * min(dx, dy)
+
+    def calc_index(self, point):
+        return int(point[1]) * self.width + int(point[0])
+
+    def verify_point(self, point):
+        x, y = int(point[0]), int(point[1])
+        return 0 <= x < self.width and 0 <= y < self.height and bool(self.free[y * self.width + x])
+
+    def get_path(self, start_index, goal_index):
+        """
+        Returns the shortest path from start to goal including both end points,
+        or an empty array if the goal can not be reached
+        """
         self.start_index = start_index
         self.goal_index = goal_index
-
-        start_node = self.Node(self.start_index,0,self.calc_heuristic(self.start_index),-1)
-        goal_node = self.Node(self.goal_index,self.calc_grid_position(self.goal_index),0,-1)
-
-        open_set,closed_set = dict(),dict()
-
-        open_set[self.calc_xy_index(self.start_index)] = start_node
-
-        while 1:
-            if len(open_set)==0:
-                print("open set is empty")
-                break
-
-            # choosing the minimum cost (f) as next node
-            current_node_key = min(open_set,key=lambda o:open_set[o].cost)
-            current_node = open_set[current_node_key]
-
-            # if current_node is goal_node
-            if current_node.point[0] == goal_node.point[0] and current_node.point[1] == goal_node.point[1]:
-                print("Find goal")
-                goal_node.parent_node = current_node.parent_node
-                goal_node.cost = current_node.cost
+        if not self.verify_point(start_index) or not self.verify_point(goal_index):
+            return np.empty((0, 2), dtype=np.int64)
+
+        width, height = self.width, self.height
+        start_id = self.calc_index(start_index)
+        goal_id = self.calc_index(goal_index)
+
+        self.g_score = np.full(width * height, np.inf)
+        self.parent = np.full(width * height, -1, dtype=np.int64)
+        self.closed = np.zeros(width * height, dtype=bool)
+
+        # memoryviews give fast scalar access to the flat arrays
+        g_score = memoryview(self.g_score)
+        parent = memoryview(self.parent)
+        closed = memoryview(self.closed)
+        free = memoryview(self.free)
+
+        g_score[start_id] = 0.
+        open_set = [(self.calc_heuristic(*start_index[:2]), 0., start_id)]
+        goal_found = False
+
+        while open_set:
+            _, current_g, current_id = heapq.heappop(open_set)
+            # lazy deletion of entries superseded by a cheaper one
+            if closed[current_id]:
+                continue
+            if current_id == goal_id:
+                goal_found = True
                 break
+            closed[current_id] = True
 
-            del open_set[current_node_key]
-            closed_set[current_node_key] = current_node
-
-            motion = [[1,0,1],[0,1,1],[-1,0,1],[0,-1,1],[-1,-1,math.sqrt(2)],[-1,1,math.sqrt(2)],[1,-1,math.sqrt(2)],[1,1,math.sqrt(2)]]
-
-            for i in motion:
-                motion_node = self.Node([current_node.point[0]+i[0],current_node.point[1]+i[1]],self.calc_grid_position([current_node.point[0]+i[0],current_node.point[1]+i[1]]),self.calc_heuristic([current_node.point[0]+i[0],current_node.point[1]+i[1]]),current_node_key)
-                motion_node.cost += i[2]
-                motion_node_key = self.calc_xy_index(motion_node.point)
-
-                if not self.verifyNode(motion_node_key):
+            current_y, current_x = divmod(current_id, width)
+            for dx, dy, move_cost in MOTIONS:
+                next_x = current_x + dx
+                next_y = current_y + dy
+                if next_x < 0 or next_y < 0 or next_x >= width or next_y >= height:
                     continue
-                if motion_node_key in closed_set:
+                next_id = next_y * width + next_x
+                if not free[next_id] or closed[next_id]:
                     continue
-                if motion_node_key not in open_set:
-                    open_set[motion_node_key] = motion_node
-                else:
-                    if open_set[motion_node_key].cost > motion_node.cost:
-                        open_set[motion_node_key] = motion_node
-
-        path_points = self.calc_final_path(goal_node,closed_set)
-
-        return np.array(path_points)
-
-    def calc_final_path(self,goal_node,closed_set):
-        path_points = []
-        parent_index = goal_node.parent_node
-
-        while parent_index!=-1:
-            n=closed_set[parent_index]
-            path_points.append(n.point)
-            parent_index = n.parent_node
-
-        return path_points
-
+                next_g = current_g + move_cost
+                if next_g < g_score[next_id]:
+                    g_score[next_id] = next_g
+                    parent[next_id] = current_id
+                    heapq.heappush(open_set, (next_g + self.calc_heuristic(next_x, next_y), next_g, next_id))
+
+        if not goal_found:
+            return np.empty((0, 2), dtype=np.int64)
+
+        return self.calc_final_path(goal_id)
+
+    def calc_final_path(self, goal_id):
+        path_ids = [goal_id]
+        parent = memoryview(self.parent)
+        while parent[path_ids[-1]] != -1:
+            path_ids.append(parent[path_ids[-1]])
+        path_ids = np.array(path_ids[::-1], dtype=np.int64)
+        return np.stack((path_ids % self.width, path_ids // self.width), axis=1)
@@ -3,13 +3,17 @@
 #  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
 # ------------------------------------------------------------------------------------------------------
 
-from copy import deepcopy
 from functools import reduce
 import logging
+import time
 
+import numpy as np
+
+from .colony import Colony
 from .bees.employee_bee import EmployeeBee
 from .bees.onlooker_bee import OnlookerBee
 from ..util.problem_base import ProblemBase
+from ..util.solution import Solution
 
 LOGGER = logging.getLogger(__name__)
 
@@ -20,29 +24,53 @@ class ABCProblem(ProblemBase):
     def __init__(self, **kwargs):
         """
         Initializes a new instance of the ABCProblem class.
+
+        Pass ``vectorized=True`` to hold the food sources in NumPy arrays (see ``Colony``)
+        instead of lists of ``EmployeeBee`` and ``OnlookerBee`` objects.
         """
         super().__init__(**kwargs)
         self.__iteration_number = kwargs['iteration_number']
+        self.__vectorized = kwargs.get('vectorized', False)
+        if self.__vectorized:
+            self.__colony = Colony(**self._agent_kwargs(kwargs))
+            return
+
+        # employee and onlooker bees share one config
+        config = EmployeeBee.config_class(**self._agent_kwargs(kwargs))
         self.__employee_bees = [
-            EmployeeBee(**kwargs, bit_generator=self._random)
+            EmployeeBee(config=config)
             for _ in range(kwargs['bees'])
         ]
 
         self.__onlooker_bees = [
-            OnlookerBee(**kwargs, bit_generator=self._random)
+            OnlookerBee(config=config)
             for _ in range(kwargs['bees'])
         ]
 
-    def solve(self):
+    def solve(self) -> Solution:
         """
         Solve the ABC problem
         """
-        best = min(self.__employee_bees + self.__onlooker_bees, key=lambda bee: bee.value)
+        if self.__vectorized:
+            return self.__solve_vectorized()
+
+        stats = self.stats
+        best_bee = min(self.__employee_bees + self.__onlooker_bees, key=lambda bee: bee.value)
+        best = Solution(best_bee.position, best_bee.value)
 
         for iteration in range(self.__iteration_number):
+            if stats is not None:
+                phase_start = time.perf_counter()
+
             # Employee bee phase
-            for bee in self.__employee_bees:
-                bee.explore()
+            if self._batch_function is not None:
+                self.__explore_batch(self.__employee_bees, [(bee.position, bee.value) for bee in self.__employee_bees])
+            else:
+                for bee in self.__employee_bees:
+                    bee.explore()
+
+            if stats is not None:
+                phase_start = stats.add_time('employee', phase_start)
 
             # Calculate the employee bees fitness values and probabilities
             overall_fitness = reduce(lambda acc, curr: acc + curr.fitness, self.__employee_bees, 0)
@@ -53,20 +81,97 @@ class ABCProblem(ProblemBase):
 
             # Onlooker phase
             # Explore new food sources based on the chosen employees' food sources
-            for bee, choice in zip(self.__onlooker_bees, choices):
-                bee.explore(choice.position, choice.value)
+            if self._batch_function is not None:
+                self.__explore_batch(self.__onlooker_bees, [(choice.position, choice.value) for choice in choices])
+            else:
+                for bee, choice in zip(self.__onlooker_bees, choices):
+                    bee.explore(choice.position, choice.value)
+
+            if stats is not None:
+                phase_start = stats.add_time('onlooker', phase_start)
 
             # Scout phase
             for bee in self.__employee_bees + self.__onlooker_bees:
                 bee.reset()
 
+            if stats is not None:
+                stats.add_time('scout', phase_start)
+
             # Update best food source
             current_best = min(self.__employee_bees + self.__onlooker_bees)
             if current_best < best:
-                best = deepcopy(current_best)
+                best = Solution(current_best.position, current_best.value)
                 LOGGER.info('Iteration %i Found new best solution="%s"', iteration+1, best.value)
 
-            if self.iteration_callback:
-                self.iteration_callback(iteration, best.position)
+            if self._end_iteration(iteration, best, lambda: [bee.position for bee in self.__employee_bees + self.__onlooker_bees]):
+                break
+
+        return self._result(best)
+
+    def population(self):
+        """
+        Get the food sources of the employee bees, then the onlooker bees, and their values
+        """
+        if self.__vectorized:
+            return self.__colony.positions.copy(), self.__colony.values.copy()
+        bees = self.__employee_bees + self.__onlooker_bees
+        return np.array([bee.position for bee in bees]), np.array([bee.value for bee in bees], dtype=np.float64)
+
+    def _replace_individuals(self, indices, positions, values):
+        if self.__vectorized:
+            self.__colony.replace(indices, positions, values)
+            return
+        bees = self.__employee_bees + self.__onlooker_bees
+        # immigrants are better than the replaced food sources, accepting them starts new trials
+        for index, position, value in zip(indices, positions, values):
+            bees[index].accept(position, value, bees[index].value)
+
+    def __solve_vectorized(self):
+        stats = self.stats
+        colony = self.__colony
+        best = colony.best()
+
+        for iteration in range(self.__iteration_number):
+            if stats is not None:
+                phase_start = time.perf_counter()
+
+            # Employee bee phase
+            colony.explore_employees()
 
-        return best
+            if stats is not None:
+                phase_start = stats.add_time('employee', phase_start)
+
+            # Onlooker phase
+            # Explore new food sources based on employees' food sources chosen proportional to their fitness
+            colony.explore_onlookers(colony.choose_food_sources())
+
+            if stats is not None:
+                phase_start = stats.add_time('onlooker', phase_start)
+
+            # Scout phase
+            colony.reset()
+
+            if stats is not None:
+                stats.add_time('scout', phase_start)
+
+            # Update best food source
+            current_best = colony.best()
+            if current_best < best:
+                best = current_best
+                LOGGER.info('Iteration %i Found new best solution="%s"', iteration+1, best.value)
+
+            if self._end_iteration(iteration, best, lambda: colony.positions):
+                break
+
+        return self._result(best)
+
+    def __explore_batch(self, bees, food_sources):
+        """
+        Explore from the given food sources and score all new positions with one batch function call.
+        """
+        new_positions = np.array([bee.propose(position) for bee, (position, _) in zip(bees, food_sources)])
+        # only positions better than their starting ones are kept
+        start_values = np.array([start_value for _, start_value in food_sources])
+        new_values = self._evaluate(new_positions, start_values)
+        for bee, new_pos, new_value, (_, start_value) in zip(bees, new_positions, new_values, food_sources):
+            bee.accept(new_pos, new_value, start_value)
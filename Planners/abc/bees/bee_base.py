@@ -4,24 +4,32 @@
 # ------------------------------------------------------------------------------------------------------
 
 from typing import Tuple
-from ...util.coordinate import Coordinate
+from ...util.coordinate import Coordinate, CoordinateConfig
 from ...util.levy_flight import levy_flight
 import numpy as np
 
 
+class BeeConfig(CoordinateConfig):
+    __slots__ = ('limit', 'low_step', 'high_step', 'high_step_prob')
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.limit = kwargs.get('trials', 3)
+        self.low_step = kwargs.get('low_step', 0.1)
+        self.high_step = kwargs.get('high_step', 0.4)
+        self.high_step_prob = kwargs.get('high_step_prob', 0.1)
+
+
 class BeeBase(Coordinate):
+    __slots__ = ('__trials', '__reset')
+
+    config_class = BeeConfig
 
     def __init__(self, **kwargs) -> None:
         """
         Initializes a new instance of the Bee class
         """
         super().__init__(**kwargs)
-        self.__limit = kwargs.get('trials', 3)
-        self.low_step = kwargs.get('low_step', 0.1)
-        self.high_step = kwargs.get('high_step', 0.4)
-        self.high_step_prob = kwargs.get('high_step_prob', 0.1)
-        self.__lower_boundary = kwargs.get('lower_boundary', 0.)
-        self.__upper_boundary = kwargs.get('upper_boundary', 1.)
         self.__trials = 0
         self.__reset = True
 
@@ -39,7 +47,7 @@ class BeeBase(Coordinate):
         """
         Reset the bee if it exceeded the trial limit.
         """
-        if self.__trials >= self.__limit:
+        if self.__trials >= self._config.limit:
             self._initialize()
             self.__trials = 0
             self.__reset = True
@@ -52,12 +60,35 @@ class BeeBase(Coordinate):
             starting_position (Tuple[float, float]): The starting position
             start_value (float): The positions value
         """
-        new_pos = levy_flight(starting_position, self.low_step, self.high_step, self.high_step_prob, self._random)
-        new_pos = np.clip(new_pos, a_min=self.__lower_boundary, a_max=self.__upper_boundary)
-        new_value = self._function(new_pos)
+        new_pos = self.propose(starting_position)
+        # only a position better than the starting one is kept
+        self.accept(new_pos, self.evaluate(new_pos, start_value), start_value)
 
+    def propose(self, starting_position: np.ndarray) -> np.ndarray:
+        """
+        Generate a new position from the starting position without evaluating it.
+
+        Args:
+            starting_position (numpy.ndarray): The starting position
+
+        Returns:
+            numpy.ndarray: The new position, clipped to the boundaries
+        """
+        config = self._config
+        new_pos = levy_flight(starting_position, config.low_step, config.high_step, config.high_step_prob, config.random)
+        return self.clip(new_pos)
+
+    def accept(self, new_pos: np.ndarray, new_value: float, start_value: float) -> None:
+        """
+        Keep the new position if it is better than the starting one.
+
+        Args:
+            new_pos (numpy.ndarray): The new position
+            new_value (float): The new position's value
+            start_value (float): The starting position's value
+        """
         if new_value < start_value:
-            self._position = new_pos
+            self.assign(new_pos, new_value)
             self.__trials = 0
             self.__reset = False
         else:
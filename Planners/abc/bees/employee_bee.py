@@ -8,6 +8,8 @@ from .bee_base import BeeBase
 
 
 class EmployeeBee(BeeBase):
+    __slots__ = ()
+
     def explore(self) -> None:
         """
         Explore new food sources from it's own position
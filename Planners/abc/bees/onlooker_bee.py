@@ -9,6 +9,8 @@ import numpy as np
 
 
 class OnlookerBee(BeeBase):
+    __slots__ = ()
+
     def explore(self, starting_position: np.ndarray, start_value: float) -> None:
         """
         Explore new food sources from the given one
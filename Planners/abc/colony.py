@@ -0,0 +1,127 @@
+import numpy as np
+
+from .bees.bee_base import BeeConfig
+from ..util.levy_flight import levy_flights
+from ..util.solution import Solution
+
+# pylint: disable=too-many-instance-attributes
+
+
+class Colony:
+    """
+    Array-backed bee colony.
+
+    The food sources of all employee and onlooker bees are held in one
+    ``(2*bees, 2*points)`` position matrix, employees first, with value and
+    trial vectors. Each phase moves all its bees with one batched Lévy flight,
+    one evaluation and one vectorized greedy selection, and the employees'
+    fitness and selection probabilities are computed on the value vector.
+
+    The reference for this engine is the object based ``ABCProblem`` (lists of
+    ``EmployeeBee`` and ``OnlookerBee``): for the same ``seed`` both consume the
+    random generator in the same order and produce the same food sources.
+    """
+
+    def __init__(self, **kwargs) -> None:
+        self.__config = BeeConfig(**kwargs)
+        # ProblemBase._evaluate of the problem, scores a population at once
+        self.__evaluate = kwargs['evaluate']
+        self.points = self.__config.points
+        self.size = kwargs['bees']
+
+        self.__positions = np.empty((2 * self.size, self.points*2))
+        for index in range(2 * self.size):
+            self.__positions[index] = self.__config.initial_position()
+        self.__values = self.__evaluate(self.__positions)
+        self.__trials = np.zeros(2 * self.size, dtype=np.int64)
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self.__positions
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.__values
+
+    @property
+    def fitness(self) -> np.ndarray:
+        """
+        Get the employee bees' fitness. Used for probability calculations
+        """
+        values = self.__values[:self.size]
+        # Prefer negative values, shift positive ones by a constant
+        return np.where(values > 0, 1 / (np.maximum(values, 0) + 1), np.abs(values) + 1)
+
+    def best(self) -> Solution:
+        """
+        Get the bee with the lowest value, employees before onlookers on ties.
+
+        Returns:
+            Solution: copy of the best food source and its value
+        """
+        index = np.argmin(self.__values)
+        return Solution(self.__positions[index], self.__values[index])
+
+    def replace(self, indices: np.ndarray, positions: np.ndarray, values: np.ndarray) -> None:
+        """
+        Set the food sources and values of the bees at indices, already evaluated, with new trial counts
+        """
+        self.__positions[indices] = positions
+        self.__values[indices] = values
+        self.__trials[indices] = 0
+
+    def explore_employees(self) -> None:
+        """
+        Employee bee phase: every employee explores from its own food source
+        """
+        employees = slice(0, self.size)
+        self.__explore(employees, self.__positions[employees], self.__values[employees])
+
+    def choose_food_sources(self) -> np.ndarray:
+        """
+        Choose an employee's food source per onlooker, proportional to the employees' fitness
+
+        Returns:
+            numpy.ndarray: the indices of the chosen employees
+        """
+        fitness = self.fitness
+        # summed in bee order so the probabilities match the object based engine
+        probabilities = fitness / np.cumsum(fitness)[-1]
+        return self.__config.random.choice(self.size, size=self.size, p=probabilities)
+
+    def explore_onlookers(self, choices: np.ndarray) -> None:
+        """
+        Onlooker phase: every onlooker explores from the food source of its chosen employee
+
+        Args:
+            choices (numpy.ndarray): the indices of the chosen employees
+        """
+        self.__explore(slice(self.size, 2 * self.size), self.__positions[choices], self.__values[choices])
+
+    def reset(self) -> None:
+        """
+        Scout phase: bees that exceeded the trial limit take a new random food source
+        """
+        exhausted = np.flatnonzero(self.__trials >= self.__config.limit)
+        if exhausted.size:
+            new_positions = np.array([self.__config.initial_position() for _ in exhausted])
+            self.__positions[exhausted] = new_positions
+            self.__values[exhausted] = self.__evaluate(new_positions)
+            self.__trials[exhausted] = 0
+
+    def __explore(self, bees: slice, start_positions: np.ndarray, start_values: np.ndarray) -> None:
+        """
+        Move the bees from the start food sources and keep the new ones that are better
+        """
+        config = self.__config
+        new_positions = np.clip(
+            levy_flights(start_positions, config.low_step, config.high_step, config.high_step_prob, config.random),
+            a_min=config.lower_boundary, a_max=config.upper_boundary)
+        # only positions better than their starting ones are kept
+        new_values = self.__evaluate(new_positions, start_values)
+        improved = new_values < start_values
+        improved_bees = np.arange(bees.start, bees.stop)[improved]
+        self.__positions[improved_bees] = new_positions[improved]
+        self.__values[improved_bees] = new_values[improved]
+        self.__trials[bees] += 1
+        self.__trials[improved_bees] = 0
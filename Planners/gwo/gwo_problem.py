@@ -3,11 +3,15 @@
 #  Licensed under the BSD 3-Clause License. See LICENSE.txt in the project root for license information.
 # ------------------------------------------------------------------------------------------------------
 
+import bisect
 import logging
-from copy import deepcopy
+import time
+
 import numpy as np
+from .pack import Pack
 from .wolf import Wolf
 from ..util.problem_base import ProblemBase
+from ..util.solution import Solution
 
 # pylint: disable=too-many-instance-attributes
 
@@ -18,38 +22,120 @@ class GWOProblem(ProblemBase):
     def __init__(self, **kwargs):
         """
         Initialize a new grey wolf optimization problem.
+
+        Pass ``vectorized=True`` to hold the pack in NumPy arrays (see ``Pack``)
+        instead of a list of ``Wolf`` objects.
         """
         super().__init__(**kwargs)
 
         self.__iteration_number = kwargs.get('iteration_number', 30)
-        self.__wolves = [
-            Wolf(**kwargs, bit_generator=self._random)
-            for _ in range(kwargs['wolves'])
-        ]
+        self.__vectorized = kwargs.get('vectorized', False)
+        if self.__vectorized:
+            self.__pack = Pack(**self._agent_kwargs(kwargs))
+        else:
+            config = Wolf.config_class(**self._agent_kwargs(kwargs))
+            self.__wolves = [
+                Wolf(config=config)
+                for _ in range(kwargs['wolves'])
+            ]
 
-    def solve(self) -> Wolf:
+    def solve(self) -> Solution:
+        if self.__vectorized:
+            return self.__solve_vectorized()
 
         # Initialization
+        stats = self.stats
         best = None
-        best_indices = np.argsort(self.__wolves)[:3]
-        alpha, beta, delta = [deepcopy(self.__wolves[index]) for index in best_indices]
+        alpha, beta, delta = self.__leaders()
 
         for iter_no in range(self.__iteration_number):
+            if stats is not None:
+                phase_start = time.perf_counter()
             a_parameter = 2 - iter_no * (2 / self.__iteration_number)
 
-            for wolf in self.__wolves:
-                wolf.step(a_parameter, alpha.position, beta.position, delta.position)
+            if self._batch_function is not None:
+                new_positions = np.array([
+                    wolf.propose(a_parameter, alpha.position, beta.position, delta.position)
+                    for wolf in self.__wolves
+                ])
+                for wolf, new_pos, value in zip(self.__wolves, new_positions, self._evaluate(new_positions)):
+                    wolf.assign(new_pos, value)
+            else:
+                # A value only matters if it is among the three best of this iteration
+                best_values = list()
+                for wolf in self.__wolves:
+                    bound = best_values[-1] if self._bounded_cost and len(best_values) == 3 else None
+                    wolf.step(a_parameter, alpha.position, beta.position, delta.position, bound)
+                    bisect.insort(best_values, wolf.value)
+                    del best_values[3:]
+
+            if stats is not None:
+                phase_start = stats.add_time('step', phase_start)
 
             if not best or alpha < best:
-                best = deepcopy(alpha)
+                best = alpha
 
             LOGGER.info('Current best value: %s, Overall best value: %s', alpha.value, best.value)
 
             # Update alpha beta delta
-            best_indices = np.argsort(self.__wolves)[:3]
-            alpha, beta, delta = [deepcopy(self.__wolves[index]) for index in best_indices]
+            alpha, beta, delta = self.__leaders()
+
+            if stats is not None:
+                stats.add_time('leaders', phase_start)
+
+            if self._end_iteration(iter_no, best, lambda: [wolf.position for wolf in self.__wolves]):
+                break
+
+        return self._result(best)
+
+    def population(self):
+        if self.__vectorized:
+            return self.__pack.positions.copy(), self.__pack.values.copy()
+        return (np.array([wolf.position for wolf in self.__wolves]),
+                np.array([wolf.value for wolf in self.__wolves], dtype=np.float64))
+
+    def _replace_individuals(self, indices, positions, values):
+        if self.__vectorized:
+            self.__pack.replace(indices, positions, values)
+            return
+        for index, position, value in zip(indices, positions, values):
+            self.__wolves[index].assign(position, value)
+
+    def __solve_vectorized(self):
+        stats = self.stats
+        best = None
+        alpha, beta, delta = self.__pack.leaders()
+
+        for iter_no in range(self.__iteration_number):
+            if stats is not None:
+                phase_start = time.perf_counter()
+            a_parameter = 2 - iter_no * (2 / self.__iteration_number)
 
-            if self.iteration_callback:
-                self.iteration_callback(iter_no, best.position)
+            self.__pack.step(a_parameter, alpha.position, beta.position, delta.position)
 
-        return best
+            if stats is not None:
+                phase_start = stats.add_time('step', phase_start)
+
+            if not best or alpha < best:
+                best = alpha
+
+            LOGGER.info('Current best value: %s, Overall best value: %s', alpha.value, best.value)
+
+            # Update alpha beta delta
+            alpha, beta, delta = self.__pack.leaders()
+
+            if stats is not None:
+                stats.add_time('leaders', phase_start)
+
+            if self._end_iteration(iter_no, best, lambda: self.__pack.positions):
+                break
+
+        return self._result(best)
+
+    def __leaders(self):
+        """
+        Snapshots of the three best wolves: alpha, beta and delta
+        """
+        # Stable, so ties are resolved by wolf order whatever the values of the other wolves
+        best_indices = np.argsort([wolf.value for wolf in self.__wolves], kind='stable')[:3]
+        return [Solution(self.__wolves[index].position, self.__wolves[index].value) for index in best_indices]
@@ -0,0 +1,93 @@
+import numpy as np
+
+from ..util.coordinate import CoordinateConfig
+from ..util.solution import Solution
+
+
+class Pack:
+    """
+    Array-backed wolf pack.
+
+    Positions and values of all wolves are held in a ``(wolves, 2*points)``
+    matrix and a value vector, the whole pack is moved with one set of broadcast
+    operations per iteration and alpha, beta and delta are selected with
+    ``np.argpartition`` on the values.
+
+    The reference for this engine is the object based ``GWOProblem`` (a list of
+    ``Wolf``): for the same ``seed`` both consume the random generator in the
+    same order (per wolf: position at initialization and ``r_1``, ``r_2`` for
+    alpha, beta and delta per step) and produce the same positions and values.
+    """
+
+    def __init__(self, **kwargs) -> None:
+        self.__config = CoordinateConfig(**kwargs)
+        # ProblemBase._evaluate of the problem, scores a population at once
+        self.__evaluate = kwargs['evaluate']
+        self.points = self.__config.points
+        self.size = kwargs['wolves']
+
+        self.__positions = np.empty((self.size, self.points*2))
+        for index in range(self.size):
+            self.__positions[index] = self.__config.initial_position()
+        self.__values = self.__evaluate(self.__positions)
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self.__positions
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.__values
+
+    def replace(self, indices: np.ndarray, positions: np.ndarray, values: np.ndarray) -> None:
+        """
+        Set the positions and values of the wolves at indices, already evaluated
+        """
+        self.__positions[indices] = positions
+        self.__values[indices] = values
+
+    def leaders(self):
+        """
+        Snapshots of the three best wolves: alpha, beta and delta.
+
+        Ties are resolved by wolf order like a stable sort of all values would.
+
+        Returns:
+            list: Solution records of the (up to) three best wolves, best first
+        """
+        values = self.__values
+        if self.size > 3:
+            # Every wolf as good as the third best one found by the partition is a candidate,
+            # usually these are exactly three
+            third_value = values[np.argpartition(values, 2)[:3]].max()
+            candidates = np.flatnonzero(values <= third_value)
+        else:
+            candidates = np.arange(self.size)
+        best_indices = candidates[np.argsort(values[candidates], kind='stable')[:3]]
+        return [Solution(self.__positions[index], values[index]) for index in best_indices]
+
+    def step(self, a_parameter: float, alpha_pos: np.ndarray, beta_pos: np.ndarray, delta_pos: np.ndarray) -> None:
+        """
+        Execute one step for all wolves.
+        Update the positions and values.
+
+        Arguments:
+            a_parameter {float} -- The current value of a, decreasing from 2 to 0
+            alpha_pos {numpy.ndarray} -- The alpha position
+            beta_pos {numpy.ndarray} -- The beta position
+            delta_pos {numpy.ndarray} -- The delta position
+        """
+        # r_1, r_2 of alpha, beta and delta per wolf
+        random_factors = self.__config.random.random(size=(self.size, 6))
+        a_factors = 2 * a_parameter * random_factors[:, 0::2, np.newaxis] - a_parameter  # Equation (3.3)
+        c_factors = 2 * random_factors[:, 1::2, np.newaxis]  # Equation (3.4)
+
+        new_positions = np.zeros_like(self.__positions)
+        for leader, leader_pos in enumerate((alpha_pos, beta_pos, delta_pos)):
+            distance = abs(c_factors[:, leader] * leader_pos - self.__positions)  # Equation (3.5)
+            new_positions += leader_pos - a_factors[:, leader] * distance  # Equation (3.6)
+
+        # Equation (3.7)
+        self.__positions = np.clip(new_positions / 3,
+                                   a_min=self.__config.lower_boundary, a_max=self.__config.upper_boundary)
+        self.__values = self.__evaluate(self.__positions)
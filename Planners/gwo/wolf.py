@@ -9,8 +9,10 @@ from ..util.coordinate import Coordinate
 
 
 class Wolf(Coordinate):
+    __slots__ = ()
+
     def step(self, a_parameter, alpha_pos: np.ndarray, beta_pos: np.ndarray,
-             delta_pos: np.ndarray) -> None:
+             delta_pos: np.ndarray, bound: float = None) -> None:
         """
         Execute a wolf step.
         Update the wolf's position and value.
@@ -19,6 +21,26 @@ class Wolf(Coordinate):
             alpha_pos {Tuple[float, float]} -- The alpha position
             beta_pos {Tuple[float, float]} -- The beta position
             delta_pos {Tuple[float, float]} -- The delta position
+            bound {float} -- Values larger than bound are of no interest, may be None
+        """
+        if bound is None:
+            self._position = self.propose(a_parameter, alpha_pos, beta_pos, delta_pos)
+        else:
+            new_pos = self.propose(a_parameter, alpha_pos, beta_pos, delta_pos)
+            self.assign(new_pos, self.evaluate(new_pos, bound))
+
+    def propose(self, a_parameter, alpha_pos: np.ndarray, beta_pos: np.ndarray,
+                delta_pos: np.ndarray) -> np.ndarray:
+        """
+        Compute the wolf's next position without evaluating it.
+
+        Arguments:
+            alpha_pos {Tuple[float, float]} -- The alpha position
+            beta_pos {Tuple[float, float]} -- The beta position
+            delta_pos {Tuple[float, float]} -- The delta position
+
+        Returns:
+            numpy.ndarray -- The new position, clipped to the boundaries
         """
 
         r_1 = self._random.random()  # r_1 is a random number in [0,1]
@@ -48,4 +70,4 @@ class Wolf(Coordinate):
         d_delta = abs(c_3 * delta_pos - self._position)  # Equation (3.5)-part 3
         x_3 = delta_pos - a_3 * d_delta  # Equation (3.5)-part 3
 
-        self._position = (x_1 + x_2 + x_3) / 3  # Equation (3.7)
+        return self.clip((x_1 + x_2 + x_3) / 3)  # Equation (3.7)
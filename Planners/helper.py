@@ -1,5 +1,12 @@
 import numpy as np
 
+from .util.com_index import ComIndex
+from .util.components import label_obstacles
+
+# Relative margin by which a vectorized cost estimate must exceed the bound to skip the exact evaluation,
+# far larger than the rounding differences between the estimate and the exact sum
+BOUND_TOLERANCE = 1e-9
+
 
 def get_next_coordinates(x, y, max_x, max_y, visited=None):
     if visited is None:
@@ -18,40 +25,20 @@ def get_next_coordinates(x, y, max_x, max_y, visited=None):
 
 
 def get_com_points(curr_map):
-    visited = np.zeros(curr_map.shape, dtype=bool)
-    com_points = list()
-    com_weights = list()
-    for y in range(curr_map.shape[0]):
-        for x in range(curr_map.shape[1]):
-            if visited[y, x]:
-                continue
-            else:
-                visited[y, x] = True
+    """
+    Returns the rounded centre of mass and the number of cells of every 8-connected obstacle
 
-            if curr_map[y, x] != 0:
-                continue
-            obstacle_points = [(x, y)]
-            obstacle_weight = 1
-            frontier = get_next_coordinates(x, y, curr_map.shape[1], curr_map.shape[0], visited)
-            while len(frontier) > 0:
-                curr_point, frontier = frontier[0], frontier[1:]
-                if visited[curr_point[1], curr_point[0]]:
-                    continue
-                else:
-                    visited[curr_point[1], curr_point[0]] = True
-
-                if curr_map[curr_point[1], curr_point[0]] == 0:
-                    obstacle_points.append(curr_point)
-                    obstacle_weight += 1
-                    frontier += get_next_coordinates(*curr_point, curr_map.shape[1], curr_map.shape[0], visited)
-            obstacle_points = np.array(obstacle_points)
-            curr_com = np.mean(obstacle_points, axis=0)
-            com_points.append(np.round(curr_com).astype(int))
-            com_weights.append(obstacle_weight)
-    return np.array(com_points), np.array(com_weights)
-
-
-def cost_func(path, curr_map, weight_1, weight_2):
+    Args:
+        curr_map (array): array of pixels containing obstacles
+    """
+    components = label_obstacles(curr_map)
+    if components.counts.shape[0] == 0:
+        return np.array([]), np.array([])
+    com_points = np.round(components.centroids).astype(int)
+    return com_points, components.counts.copy()
+
+
+def cost_func(path, curr_map, weight_1, weight_2, bound=None):
     """
     Returns the cost calculated as a weighted sum of the obstacle violations and the length of the path
 
@@ -60,11 +47,16 @@ def cost_func(path, curr_map, weight_1, weight_2):
         curr_map (array): array of pixels containing obstacles
         weight_1 (float): weight given to obstacle avoidance
         weight_2 (float): weight given to shortest length
+        bound (float): if given, inf is returned without the exact evaluation if a vectorized estimate
+            of the cost is larger than bound
     """
     total_weight = weight_1 + weight_2
     weight_1 /= total_weight
     weight_2 /= total_weight
 
+    if bound is not None and bound < np.inf and _exceeds_bound(weight_1, weight_2, path, curr_map, 0, bound):
+        return np.inf
+
     length_of_path = 0
     violation = 0
     prev_x, prev_y = path[0]
@@ -83,12 +75,33 @@ def cost_func(path, curr_map, weight_1, weight_2):
     return cost
 
 
-def cost_func2(path, curr_map, com_points, com_weights, weight_1, weight_2, weight_3):
+def cost_func2(path, curr_map, com_points, com_weights, weight_1, weight_2, weight_3, com_cost=None, bound=None):
+    """
+    Returns the cost calculated as a weighted sum of the obstacle violations, the length of the path
+    and the obstacle weights divided by their distance to the path
+
+    Args:
+        path (array): array of pixels containing the path
+        curr_map (array): array of pixels containing obstacles
+        com_points (array): obstacle centre of mass points
+        com_weights (array): obstacle weights
+        weight_1 (float): weight given to obstacle avoidance
+        weight_2 (float): weight given to shortest length
+        weight_3 (float): weight given to obstacle centre of mass distance
+        com_cost (float): precomputed centre of mass term, e.g. from a ComIndex
+        bound (float): if given, inf is returned without the exact evaluation if a vectorized estimate
+            of the cost is larger than bound
+    """
     total_weight = weight_1 + weight_2 + weight_3
     weight_1 /= total_weight
     weight_2 /= total_weight
     weight_3 /= total_weight
 
+    # the centre of mass term is not negative, it is left out of the estimate if it is not known yet
+    known_cost = weight_3 * com_cost if com_cost is not None else 0
+    if bound is not None and bound < np.inf and _exceeds_bound(weight_1, weight_2, path, curr_map, known_cost, bound):
+        return np.inf
+
     length_of_path = 0
     violation = 0
     prev_x, prev_y = path[0]
@@ -102,16 +115,15 @@ def cost_func2(path, curr_map, com_points, com_weights, weight_1, weight_2, weig
         if curr_cost == 0:
             violation += 1
 
-    com_cost = 0
-    for i in range(len(com_points)):
-        com_x, com_y = com_points[i, 0], com_points[i, 1]
-        com_mass = com_weights[i]
-        min_distance = np.inf
-        for curr_x, curr_y in path:
-            curr_distance = np.sqrt((com_x - curr_x)**2 + (com_y - curr_y)**2)
-            if curr_distance < min_distance:
-                min_distance = curr_distance
-        com_cost += (com_mass / min_distance)
+    if com_cost is None:
+        com_cost = 0
+        if len(com_points) > 0:
+            path = np.asarray(path)
+            com_points = np.asarray(com_points)
+            distance = (com_points[:, None, 0] - path[None, :, 0]).astype(np.int64)**2
+            distance += (com_points[:, None, 1] - path[None, :, 1]).astype(np.int64)**2
+            with np.errstate(divide='ignore'):
+                com_cost = np.sum(com_weights / np.sqrt(distance.min(axis=1)))
 
     cost = weight_1 * violation + weight_2 * length_of_path + weight_3 * com_cost
 
@@ -142,14 +154,258 @@ def linear_interpolation(start, end, inter_points):
     """
     Returns the straight path between start and goal position
     """
-    prev_point = start
-    inter_points = np.append(inter_points, np.array([end]), axis=0)
-    path = None
-    for point in inter_points:
-        curr_path = draw_line(prev_point, point)
-        if path is None:
-            path = curr_path
+    waypoints = _get_waypoints(start, end, np.asarray(inter_points).reshape(1, -1, 2))
+    seg_steps = _get_segment_steps(waypoints)
+    path = np.empty((int(seg_steps.sum()) + 1, 2), dtype=np.int32)
+    path[0] = waypoints[0, 0]
+    rasterize_polylines(waypoints, out=path[1:])
+    return path
+
+
+def rasterize_polylines(waypoints, out=None):
+    """
+    Rasterizes many polylines at once, pixel for pixel like linear_interpolation
+
+    Args:
+        waypoints (array): (N, W, 2) integer waypoints, including start and end, of N polylines
+        out (array): preallocated (T, 2) int32 buffer the pixels are written to
+
+    Returns:
+        tuple: (pixels, counts) where pixels is a (T, 2) int32 array holding, polyline after
+        polyline, every pixel that follows the first waypoint and counts holds the number of
+        those pixels for every polyline
+    """
+    waypoints = np.asarray(waypoints)
+    seg_steps = _get_segment_steps(waypoints)
+    if out is None:
+        out = np.empty((int(seg_steps.sum()), 2), dtype=np.int32)
+    _rasterize_segments(waypoints[:, :-1].reshape(-1, 2), waypoints[:, 1:].reshape(-1, 2), seg_steps.ravel(), out)
+    return out, seg_steps.sum(axis=1)
+
+
+def count_polylines(waypoints, curr_map, chunk_size=1 << 16):
+    """
+    Returns the obstacle pixel count and the length, as measured by cost_func, of many polylines
+    without building their pixel lists: the segments are rasterized a chunk of about chunk_size
+    pixels at a time into one reused buffer and only the counts are kept
+
+    Args:
+        waypoints (array): (N, W, 2) integer waypoints, including start and end, of N polylines
+        curr_map (array): array of pixels containing obstacles
+        chunk_size (int): number of pixels rasterized at a time
+
+    Returns:
+        tuple: (violation, length) arrays of the N polylines
+    """
+    waypoints = np.asarray(waypoints)
+    num_polylines, num_waypoints = waypoints.shape[:2]
+    seg_start = waypoints[:, :-1].reshape(-1, 2)
+    seg_end = waypoints[:, 1:].reshape(-1, 2)
+    seg_steps = _get_segment_steps(waypoints).ravel()
+    seg_owners = np.repeat(np.arange(num_polylines), num_waypoints - 1)
+    shared_first = num_polylines > 0 and bool(np.all(waypoints[:, 0] == waypoints[0, 0]))
+    seg_ends = np.cumsum(seg_steps)
+    buffer = np.empty((min(chunk_size, int(seg_ends[-1]) if seg_ends.shape[0] else 0), 2), dtype=np.int32)
+
+    violation = np.zeros(num_polylines)
+    length_of_path = np.zeros(num_polylines)
+    first = 0
+    while first < seg_steps.shape[0]:
+        # a segment longer than a chunk is a chunk of its own
+        last = max(int(np.searchsorted(seg_ends, seg_ends[first] - seg_steps[first] + chunk_size, side='right')),
+                   first + 1)
+        chunk_steps = seg_steps[first:last]
+        num_pixels = int(chunk_steps.sum())
+        if num_pixels > buffer.shape[0]:
+            buffer = np.empty((num_pixels, 2), dtype=np.int32)
+        pixels = _rasterize_segments(seg_start[first:last], seg_end[first:last], chunk_steps, buffer[:num_pixels])
+        owners = np.repeat(seg_owners[first:last], chunk_steps)
+        first_points = waypoints[0, 0] if shared_first else waypoints[owners, 0]
+        chunk_violation, chunk_length = _violation_and_length(pixels, owners, first_points, curr_map, num_polylines)
+        violation += chunk_violation
+        length_of_path += chunk_length
+        first = last
+    return violation, length_of_path
+
+
+def batch_linear_interpolation(start, end, inter_points):
+    """
+    Returns the straight paths between start and goal position for a batch of intermediate points
+
+    Args:
+        start (array): start position
+        end (array): goal position
+        inter_points (array): (N, points, 2) intermediate points of N paths
+
+    Returns:
+        list: N paths, each identical to linear_interpolation(start, end, inter_points[i])
+    """
+    waypoints = _get_waypoints(start, end, inter_points)
+    pixels, counts = rasterize_polylines(waypoints)
+    first = waypoints[0, :1].astype(np.int32)
+    return [np.concatenate((first, path)) for path in np.split(pixels, np.cumsum(counts)[:-1])]
+
+
+def batch_cost_func(start, end, inter_points, curr_map, weight_1, weight_2, bound=None):
+    """
+    Returns cost_func of the paths through a batch of intermediate points without building the paths
+
+    Args:
+        start (array): start position
+        end (array): goal position
+        inter_points (array): (N, points, 2) intermediate points of N paths
+        curr_map (array): array of pixels containing obstacles
+        weight_1 (float): weight given to obstacle avoidance
+        weight_2 (float): weight given to shortest length
+        bound (float or array): if given, inf is returned for the paths whose length alone makes
+            their cost larger than bound, without rasterizing them
+
+    Returns:
+        array: N costs, equal to cost_func up to floating point rounding
+    """
+    total_weight = weight_1 + weight_2
+    weight_1 /= total_weight
+    weight_2 /= total_weight
+
+    waypoints = _get_waypoints(start, end, inter_points)
+    cost = np.full(waypoints.shape[0], np.inf)
+    # every pixel adds at least 1 to the length
+    within = _within_bound(weight_2 * _get_segment_steps(waypoints).sum(axis=1), bound)
+    violation, length_of_path = count_polylines(waypoints[within], curr_map)
+    cost[within] = weight_1 * violation + weight_2 * length_of_path
+
+    return cost
+
+
+def batch_cost_func2(start, end, inter_points, curr_map, com_points, com_weights, weight_1, weight_2, weight_3,
+                     com_index=None, bound=None):
+    """
+    Returns cost_func2 of the paths through a batch of intermediate points without building the paths
+
+    Args:
+        start (array): start position
+        end (array): goal position
+        inter_points (array): (N, points, 2) intermediate points of N paths
+        curr_map (array): array of pixels containing obstacles
+        com_points (array): obstacle centre of mass points
+        com_weights (array): obstacle weights
+        weight_1 (float): weight given to obstacle avoidance
+        weight_2 (float): weight given to shortest length
+        weight_3 (float): weight given to obstacle centre of mass distance
+        com_index (ComIndex): prebuilt index of com_points and com_weights, built on the fly if not given
+        bound (float or array): if given, inf is returned for the paths whose length and centre of mass
+            term alone make their cost larger than bound, without rasterizing them
+
+    Returns:
+        array: N costs, equal to cost_func2 up to floating point rounding
+    """
+    total_weight = weight_1 + weight_2 + weight_3
+    weight_1 /= total_weight
+    weight_2 /= total_weight
+    weight_3 /= total_weight
+
+    waypoints = _get_waypoints(start, end, inter_points)
+    cost = np.full(waypoints.shape[0], np.inf)
+    # every pixel adds at least 1 to the length
+    min_length_cost = weight_2 * _get_segment_steps(waypoints).sum(axis=1)
+    within = _within_bound(min_length_cost, bound)
+
+    if com_index is None:
+        com_index = ComIndex(com_points, com_weights)
+    known_cost = np.full(waypoints.shape[0], np.inf)
+    known_cost[within] = weight_3 * com_index.com_cost(waypoints[within])
+    within &= _within_bound(min_length_cost + known_cost, bound)
+
+    violation, length_of_path = count_polylines(waypoints[within], curr_map)
+    cost[within] = weight_1 * violation + weight_2 * length_of_path + known_cost[within]
+
+    return cost
+
+
+def _get_waypoints(start, end, inter_points):
+    inter_points = np.asarray(inter_points)
+    num_paths = inter_points.shape[0]
+    start = np.broadcast_to(np.asarray(start, dtype=np.int64), (num_paths, 1, 2))
+    end = np.broadcast_to(np.asarray(end, dtype=np.int64), (num_paths, 1, 2))
+    return np.concatenate((start, inter_points.astype(np.int64), end), axis=1)
+
+
+def _exceeds_bound(weight_1, weight_2, path, curr_map, known_cost, bound):
+    # Vectorized estimate of the violation and length terms of cost_func, equal to its loop up to rounding
+    path = np.asarray(path)
+    violation, length_of_path = _violation_and_length(path[1:], np.zeros(len(path) - 1, dtype=np.int64),
+                                                      path[0], curr_map, 1)
+    estimate = known_cost + weight_1 * violation[0] + weight_2 * length_of_path[0]
+    return estimate - bound > BOUND_TOLERANCE * max(1., abs(bound))
+
+
+def _within_bound(lower_bound, bound):
+    # Paths whose cost can still be at most bound, every path if there is no bound
+    if bound is None:
+        return np.ones(lower_bound.shape[0], dtype=bool)
+    return lower_bound <= bound
+
+
+def _get_segment_steps(waypoints):
+    # Pixels of every segment after its first one: the larger of the x and y distances
+    return np.max(np.abs(np.diff(waypoints, axis=1)), axis=2).astype(np.int64)
+
+
+def _rasterize_segments(seg_start, seg_end, seg_steps, out):
+    # Same arithmetic as np.linspace(start, end, steps + 1)[1:] for every segment, written to out
+    seg_start = seg_start.astype(np.float64)
+    seg_end = seg_end.astype(np.float64)
+    seg_ends = np.cumsum(seg_steps)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        step = (seg_end - seg_start) / seg_steps.reshape(-1, 1)
+    k = np.arange(1, out.shape[0] + 1, dtype=np.float64)
+    k -= np.repeat(seg_ends - seg_steps, seg_steps)
+    pixels = k.reshape(-1, 1) * np.repeat(step, seg_steps, axis=0)
+    pixels += np.repeat(seg_start, seg_steps, axis=0)
+    nonempty = seg_steps > 0
+    pixels[seg_ends[nonempty] - 1] = seg_end[nonempty]
+    np.round(pixels, out=pixels)
+    out[...] = pixels
+    return out
+
+
+def _violation_and_length(pixels, owners, first_points, curr_map, num_paths):
+    # Same per-pixel terms as cost_func, which measures every step against the first pixel,
+    # first_points holds the first pixel of the polyline of every pixel or a single shared one
+    violation = np.bincount(owners, weights=curr_map[pixels[:, 1], pixels[:, 0]] == 0, minlength=num_paths)
+    straight = (pixels[:, 0] == first_points[..., 0]) | (pixels[:, 1] == first_points[..., 1])
+    straight_steps = np.bincount(owners, weights=straight, minlength=num_paths)
+    diagonal_steps = np.bincount(owners, minlength=num_paths) - straight_steps
+    return violation, straight_steps + (2 ** 0.5) * diagonal_steps
+
+
+def get_path_cost(curr_map, path):
+    """
+    Returns the length, the number of obstacle entries and the number of obstacle pixels of a path,
+    the path quality measures of the planner comparison notebooks. All three are None for an empty
+    path, as returned by planners that can't reach the goal.
+
+    Args:
+        curr_map (array): array of pixels containing obstacles
+        path (array): array of pixels containing the path
+    """
+    if len(path) == 0:
+        return None, None, None
+    length = 0
+    violations = 0
+    violation_cost = 0
+    prev_x, prev_y = path[0]
+    prev_cost = curr_map[prev_y, prev_x]
+    root_2 = 2 ** 0.5
+    for curr_x, curr_y in path[1:]:
+        if curr_x == prev_x or curr_y == prev_y:
+            length += 1
         else:
-            path = np.append(path, curr_path[1:], axis=0)
-        prev_point = point
-    return path.round().astype(np.int32)
+            length += root_2
+        curr_cost = curr_map[curr_y, curr_x]
+        if curr_cost == 0:
+            violation_cost += 1
+            if curr_cost != prev_cost:
+                violations += 1
+        prev_cost = curr_cost
+    return length, violations, violation_cost
@@ -6,18 +6,29 @@
 from typing import Tuple
 import numpy as np
 
-from ..util.coordinate import Coordinate
+from ..util.coordinate import Coordinate, CoordinateConfig
 
 # pylint: disable=too-many-instance-attributes
 
 
+class ParticleConfig(CoordinateConfig):
+    __slots__ = ('w', 'c_1', 'c_2', 'max_velocity')
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.w = kwargs.get('weight', .5)
+        self.c_1 = kwargs.get('c_1', 2)
+        self.c_2 = kwargs.get('c_2', 2)
+        self.max_velocity = kwargs.get('maximum_velocity', 0.2)
+
+
 class Particle(Coordinate):
+    __slots__ = ('__velocity', '__best_position', '__best_value')
+
+    config_class = ParticleConfig
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.__w = kwargs.get('weight', .5)
-        self.__c_1 = kwargs.get('c_1', 2)
-        self.__c_2 = kwargs.get('c_2', 2)
-        self.__max_velocity = kwargs.get('maximum_velocity', 0.2)
 
         # Randomly create a new particle properties
         self.__velocity = self._random.uniform(-1, 1, size=self.points*2)
@@ -31,26 +42,50 @@ class Particle(Coordinate):
     def velocity(self) -> float:
         return self.__velocity
 
-    def step(self, global_best_pos: np.ndarray) -> None:
+    def step(self, global_best_pos: np.ndarray, bound: float = None) -> None:
         """
         Execute a particle step.
         Update the particle's velocity, position and value.
 
         Arguments:
             global_best_pos {Tuple[float, float]} -- The global best position
+            bound {float} -- Values larger than bound and the local best value are of no interest, may be None
+        """
+        if bound is None:
+            self._position = self.propose(global_best_pos)
+            self.__update_best()
+        else:
+            new_pos = self.propose(global_best_pos)
+            self.assign(new_pos, self.evaluate(new_pos, max(bound, self.__best_value)))
+
+    def propose(self, global_best_pos: np.ndarray) -> np.ndarray:
+        """
+        Update the particle's velocity and return its next position without evaluating it.
+
+        Arguments:
+            global_best_pos {numpy.ndarray} -- The global best position
+
+        Returns:
+            numpy.ndarray -- The new position, clipped to the boundaries
         """
 
         # Calculate velocity
-        cognitive_velocity = self.__c_1 * self._random.random(size=self.points*2) * (self.__best_position - self._position)
-        social_velocity = self.__c_2 * self._random.random(size=self.points*2) * (global_best_pos - self._position)
-        self.__velocity = self.__w * self.__velocity + cognitive_velocity + social_velocity
+        config = self._config
+        cognitive_velocity = config.c_1 * config.random.random(size=config.points*2) * (self.__best_position - self._position)
+        social_velocity = config.c_2 * config.random.random(size=config.points*2) * (global_best_pos - self._position)
+        self.__velocity = config.w * self.__velocity + cognitive_velocity + social_velocity
 
         # Clip velocity
         #self.__clip_velocity()
 
         # Update position and clip it to boundaries
-        self._position = self._position + self.__velocity
+        return self.clip(self._position + self.__velocity)
+
+    def assign(self, new_pos: np.ndarray, value: float) -> None:
+        super().assign(new_pos, value)
+        self.__update_best()
 
+    def __update_best(self):
         # Update local best
         if self.value < self.__best_value:
             self.__best_position = self._position
@@ -58,5 +93,5 @@ class Particle(Coordinate):
 
     def __clip_velocity(self):
         norm = np.linalg.norm(self.__velocity)
-        if norm > self.__max_velocity:
-            self.__velocity *= self.__max_velocity/norm
+        if norm > self._config.max_velocity:
+            self.__velocity *= self._config.max_velocity/norm
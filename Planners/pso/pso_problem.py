@@ -6,10 +6,14 @@
 # pylint: disable=too-many-instance-attributes
 
 import logging
-from copy import deepcopy
+import time
+
+import numpy as np
 
 from .particle import Particle
+from .swarm import Swarm
 from ..util.problem_base import ProblemBase
+from ..util.solution import Solution
 
 LOGGER = logging.getLogger(__name__)
 
@@ -18,30 +22,99 @@ class PSOProblem(ProblemBase):
     def __init__(self, **kwargs):
         """
         Initialize a new particle swarm optimization problem.
+
+        Pass ``vectorized=True`` to hold the swarm in NumPy arrays (see ``Swarm``)
+        instead of a list of ``Particle`` objects.
         """
         super().__init__(**kwargs)
         self.__iteration_number = kwargs['iteration_number']
-        self.__particles = [
-            Particle(**kwargs, bit_generator=self._random)
-            for _ in range(kwargs['particles'])
-        ]
+        self.__vectorized = kwargs.get('vectorized', False)
+        if self.__vectorized:
+            self.__swarm = Swarm(**self._agent_kwargs(kwargs))
+        else:
+            config = Particle.config_class(**self._agent_kwargs(kwargs))
+            self.__particles = [
+                Particle(config=config)
+                for _ in range(kwargs['particles'])
+            ]
+
+    def solve(self) -> Solution:
+        if self.__vectorized:
+            return self.__solve_vectorized()
 
-    def solve(self) -> Particle:
         # And also update global_best_particle
+        stats = self.stats
         best = None
         for iteration in range(self.__iteration_number):
+            if stats is not None:
+                phase_start = time.perf_counter()
 
             # Update global best
             global_best_particle = min(self.__particles)
+            if not best or global_best_particle < best:
+                best = Solution(global_best_particle.position, global_best_particle.value)
 
-            for particle in self.__particles:
-                particle.step(global_best_particle.position)
+            if stats is not None:
+                phase_start = stats.add_time('selection', phase_start)
 
-            if not best or global_best_particle < best:
-                best = deepcopy(global_best_particle)
+            # Positions are replaced, not mutated, by a step so this is a snapshot
+            global_best_pos = global_best_particle.position
+            if self._batch_function is not None:
+                new_positions = np.array([particle.propose(global_best_pos) for particle in self.__particles])
+                for particle, new_pos, value in zip(self.__particles, new_positions, self._evaluate(new_positions)):
+                    particle.assign(new_pos, value)
+            else:
+                # A value only matters if it is a new local best or the minimum of this iteration
+                bound = np.inf if self._bounded_cost else None
+                for particle in self.__particles:
+                    particle.step(global_best_pos, bound)
+                    if bound is not None:
+                        bound = min(bound, particle.value)
+
+            if stats is not None:
+                stats.add_time('step', phase_start)
+
+            if self._end_iteration(iteration, best, lambda: [particle.position for particle in self.__particles]):
+                break
+
+        LOGGER.info('Last best solution="%s"', best.value)
+        return self._result(best)
+
+    def population(self):
+        if self.__vectorized:
+            return self.__swarm.positions.copy(), self.__swarm.values.copy()
+        return (np.array([particle.position for particle in self.__particles]),
+                np.array([particle.value for particle in self.__particles], dtype=np.float64))
+
+    def _replace_individuals(self, indices, positions, values):
+        if self.__vectorized:
+            self.__swarm.replace(indices, positions, values)
+            return
+        for index, position, value in zip(indices, positions, values):
+            self.__particles[index].assign(position, value)
+
+    def __solve_vectorized(self):
+        stats = self.stats
+        best = None
+        for iteration in range(self.__iteration_number):
+            if stats is not None:
+                phase_start = time.perf_counter()
+
+            # Update global best
+            global_best = self.__swarm.global_best()
+            if not best or global_best < best:
+                best = global_best
+
+            if stats is not None:
+                phase_start = stats.add_time('selection', phase_start)
+
+            self.__swarm.step(global_best.position)
+
+            if stats is not None:
+                stats.add_time('step', phase_start)
 
-            if self.iteration_callback:
-                self.iteration_callback(iteration, best.position)
+            if self._end_iteration(iteration, best, lambda: self.__swarm.positions):
+                break
 
         LOGGER.info('Last best solution="%s"', best.value)
-        return best
+        return self._result(best)
@@ -0,0 +1,103 @@
+import numpy as np
+
+from .particle import ParticleConfig
+from ..util.solution import Solution
+
+# pylint: disable=too-many-instance-attributes
+
+
+class Swarm:
+    """
+    Array-backed particle swarm.
+
+    Positions, velocities and personal bests of all particles are held in
+    ``(particles, 2*points)`` arrays and the whole swarm is advanced with one
+    set of broadcast operations per iteration.
+
+    The reference for this engine is the object based ``PSOProblem`` (a list of
+    ``Particle``): for the same ``seed`` both consume the random generator in the
+    same order (per particle: position, velocity at initialization and
+    ``r_1``, ``r_2`` per step) and produce the same positions and values.
+    """
+
+    def __init__(self, **kwargs) -> None:
+        self.__config = ParticleConfig(**kwargs)
+        # ProblemBase._evaluate of the problem, scores a population at once
+        self.__evaluate = kwargs['evaluate']
+        self.points = self.__config.points
+        self.size = kwargs['particles']
+
+        config = self.__config
+        dimension = self.points * 2
+        self.__positions = np.empty((self.size, dimension))
+        self.__velocities = np.empty((self.size, dimension))
+        for index in range(self.size):
+            self.__positions[index] = config.initial_position()
+            velocity = config.random.uniform(-1, 1, size=dimension)
+            norm = np.linalg.norm(velocity)
+            if norm > config.max_velocity:
+                velocity *= config.max_velocity/norm
+            self.__velocities[index] = velocity
+
+        self.__values = self.__evaluate(self.__positions)
+        self.__best_positions = self.__positions.copy()
+        self.__best_values = self.__values.copy()
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self.__positions
+
+    @property
+    def velocities(self) -> np.ndarray:
+        return self.__velocities
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.__values
+
+    def replace(self, indices: np.ndarray, positions: np.ndarray, values: np.ndarray) -> None:
+        """
+        Set the positions and values of the particles at indices, already evaluated,
+        updating their personal bests. Velocities are kept.
+        """
+        self.__positions[indices] = positions
+        self.__values[indices] = values
+        improved = values < self.__best_values[indices]
+        self.__best_positions[indices[improved]] = positions[improved]
+        self.__best_values[indices[improved]] = values[improved]
+
+    def global_best(self) -> Solution:
+        """
+        Get the particle with the lowest current value.
+
+        Returns:
+            Solution: copy of the best particle's position and its value
+        """
+        index = np.argmin(self.__values)
+        return Solution(self.__positions[index], self.__values[index])
+
+    def step(self, global_best_pos: np.ndarray) -> None:
+        """
+        Execute one step for all particles.
+        Update the velocities, positions, values and personal bests.
+
+        Arguments:
+            global_best_pos {numpy.ndarray} -- The global best position
+        """
+        config = self.__config
+        random_factors = config.random.random(size=(self.size, 2, self.points*2))
+
+        # Calculate velocity
+        cognitive_velocity = config.c_1 * random_factors[:, 0] * (self.__best_positions - self.__positions)
+        social_velocity = config.c_2 * random_factors[:, 1] * (global_best_pos - self.__positions)
+        self.__velocities = config.w * self.__velocities + cognitive_velocity + social_velocity
+
+        # Update position and clip it to boundaries
+        self.__positions = np.clip(self.__positions + self.__velocities,
+                                   a_min=config.lower_boundary, a_max=config.upper_boundary)
+        self.__values = self.__evaluate(self.__positions)
+
+        # Update local best
+        improved = self.__values < self.__best_values
+        self.__best_positions[improved] = self.__positions[improved]
+        self.__best_values[improved] = self.__values[improved]
@@ -0,0 +1,145 @@
+"""
+asyncio interface of the planners.
+
+A query runs in an executor while the event loop stays free. The best path so far is streamed
+after every iteration of the optimizer or every episode of Q-learning, built on the
+iteration_callback of ProblemBase and the episode_callback of QLearningPathPlanner:
+
+    async for update in stream_plan(planner, start, end, timeout=0.5):
+        send(update.path)
+
+A query stops at its deadline with the best path found so far, and stops if the task awaiting it is
+cancelled. Either way the planner stops at the end of its current iteration or episode.
+"""
+import asyncio
+import threading
+from typing import NamedTuple
+
+import numpy as np
+
+from qlearning.qlearning import QLearningPathPlanner
+from .planner_base import particle_to_path
+
+
+class PlanUpdate(NamedTuple):
+    """
+    Best path after a number of iterations (episodes for Q-learning),
+    final is True for the last update of a query
+    """
+    iteration: int
+    path: np.ndarray
+    final: bool
+
+
+async def stream_plan(planner, start=None, end=None, timeout=None, deadline=None, executor=None, interval=1):
+    """
+    Runs a query in an executor and yields a PlanUpdate with the best path every interval iterations
+
+    The last update is final. It is the result of the planner if it finished in time, or the last
+    update repeated as final at the deadline. A planner stopped at its deadline before its first update
+    still runs to the end of the first iteration. Leaving the loop early or cancelling the task stops
+    the planner once the generator is closed, with contextlib.aclosing to close it right away.
+
+    Args:
+        planner: a PlannerBase, planning from start to end, or a QLearningPathPlanner,
+            training from its own start point to its goal
+        start (array): start point of a PlannerBase query
+        end (array): end point of a PlannerBase query
+        timeout (float): seconds from now the query has to finish in
+        deadline (float): event loop time (loop.time()) the query has to finish by
+        executor (Executor): executor the planner runs in, the default executor of the loop if None
+        interval (int): iterations between two updates
+
+    Yields:
+        PlanUpdate: the best path so far
+    """
+    loop = asyncio.get_running_loop()
+    if timeout is not None:
+        deadline = loop.time() + timeout if deadline is None else min(deadline, loop.time() + timeout)
+    updates = asyncio.Queue()
+    stop = threading.Event()
+
+    def publish(update):
+        loop.call_soon_threadsafe(updates.put_nowait, update)
+
+    if isinstance(planner, QLearningPathPlanner):
+        run = _get_training_run(planner, publish, stop, interval)
+    else:
+        run = _get_query_run(planner, start, end, publish, stop, interval)
+
+    def worker():
+        try:
+            publish(run())
+        except BaseException as error:  # pylint: disable=broad-except
+            publish(error)
+
+    loop.run_in_executor(executor, worker)
+    last_update = None
+    try:
+        while True:
+            remaining = None if deadline is None or stop.is_set() else deadline - loop.time()
+            try:
+                update = await asyncio.wait_for(updates.get(), remaining)
+            except asyncio.TimeoutError:
+                stop.set()
+                if last_update is not None:
+                    yield last_update._replace(final=True)
+                    return
+                continue
+            if isinstance(update, BaseException):
+                raise update
+            last_update = update
+            yield update
+            if update.final:
+                return
+    finally:
+        stop.set()
+
+
+async def plan_async(planner, start=None, end=None, timeout=None, deadline=None, executor=None):
+    """
+    Runs a query in an executor and returns the final PlanUpdate of stream_plan:
+    the planner's path, or the best path so far at the deadline
+    """
+    updates = stream_plan(planner, start, end, timeout=timeout, deadline=deadline, executor=executor)
+    try:
+        async for update in updates:
+            if update.final:
+                return update
+    finally:
+        await updates.aclose()
+    return None
+
+
+def _get_query_run(planner, start, end, publish, stop, interval):
+    iterations = [0]
+
+    def iteration_callback(iteration, best_position):
+        iterations[0] = iteration + 1
+        if iterations[0] % interval == 0:
+            publish(PlanUpdate(iterations[0], particle_to_path(planner.map, start, end, best_position), False))
+        return stop.is_set()
+
+    def run():
+        best_sol = planner.solve(start, end, iteration_callback=iteration_callback)
+        return PlanUpdate(iterations[0], particle_to_path(planner.map, start, end, best_sol.position), True)
+    return run
+
+
+def _get_training_run(planner, publish, stop, interval):
+    user_callback = planner.episode_callback
+
+    def episode_callback(episodes_trained):
+        user_stop = user_callback is not None and user_callback(episodes_trained)
+        if episodes_trained % interval == 0:
+            publish(PlanUpdate(episodes_trained, planner.get_greedy_path(), False))
+        return stop.is_set() or user_stop
+
+    def run():
+        planner.episode_callback = episode_callback
+        try:
+            episodes_trained = planner.train()
+        finally:
+            planner.episode_callback = user_callback
+        return PlanUpdate(episodes_trained, planner.get_greedy_path(), True)
+    return run
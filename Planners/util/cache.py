@@ -0,0 +1,66 @@
+from collections import OrderedDict
+import hashlib
+
+import numpy as np
+
+
+class LRUCache:
+    """
+    Size-bounded mapping that evicts the least recently used entry.
+    """
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, key):
+        return key in self.__entries
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value of key, or default if it is not cached
+        """
+        if key in self.__entries:
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return self.__entries[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        self.__entries[key] = value
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.maxsize:
+            self.__entries.popitem(last=False)
+
+    def get_or_create(self, key, factory):
+        """
+        Returns the cached value of key, calling factory() to create and cache it if needed
+        """
+        if key in self.__entries:
+            return self.get(key)
+        self.misses += 1
+        value = factory()
+        self.put(key, value)
+        return value
+
+    def clear(self):
+        self.__entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def get_map_fingerprint(curr_map):
+    """
+    Returns a digest identifying the content of a map, used as cache key for per-map artifacts
+    """
+    curr_map = np.ascontiguousarray(curr_map)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str((curr_map.shape, curr_map.dtype.str)).encode())
+    digest.update(curr_map.data)
+    return digest.hexdigest()
@@ -0,0 +1,97 @@
+import numpy as np
+
+
+class ComIndex:
+    """
+    Per-map index over the obstacle centre of mass points used by the COM term of cost_func2.
+
+    The COM term needs, for every centre of mass, the distance to the closest pixel of the
+    rasterized path. Instead of measuring every pixel, the index projects each centre of mass
+    on every path segment and only measures the pixels inside a window around the projection.
+    A rasterized pixel is at most half a pixel away from its segment, so the window bounds
+    where the closest pixel can be and the result is exactly the one of cost_func2.
+    """
+
+    def __init__(self, com_points, com_weights):
+        self.com_points = np.asarray(com_points, dtype=np.float64).reshape(-1, 2)
+        self.com_weights = np.asarray(com_weights, dtype=np.float64).reshape(-1)
+
+    def __len__(self):
+        return self.com_points.shape[0]
+
+    def min_distances(self, waypoints):
+        """
+        Returns the distance of every centre of mass to the closest pixel of every path
+
+        Args:
+            waypoints (array): (N, W, 2) integer waypoints, including start and end, of N paths
+
+        Returns:
+            array: (N, number of centre of mass points) distances
+        """
+        waypoints = np.asarray(waypoints, dtype=np.float64)
+        num_paths = waypoints.shape[0]
+        num_com = len(self)
+        if num_com == 0 or num_paths == 0:
+            return np.zeros((num_paths, num_com))
+
+        seg_start = waypoints[:, :-1].reshape(-1, 1, 2)
+        seg_end = waypoints[:, 1:].reshape(-1, 1, 2)
+        delta = seg_end - seg_start
+        seg_steps = np.max(np.abs(delta), axis=2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = np.where(seg_steps[..., None] > 0, delta / seg_steps[..., None], 0.)
+        step_norm2 = np.sum(step ** 2, axis=2)
+        safe_norm2 = np.where(step_norm2 > 0, step_norm2, 1.)
+
+        # Projection of every centre of mass on every segment, in pixel steps along the segment
+        offset = self.com_points[None] - seg_start
+        along = np.sum(offset * step, axis=2)
+        t_proj = along / safe_norm2
+        perp2 = np.maximum(np.sum(offset ** 2, axis=2) - along * t_proj, 0.)
+
+        k_closest = np.clip(np.round(t_proj), 0, seg_steps)
+        closest_dist = np.sqrt(self.__pixel_distance2(k_closest, seg_start, seg_end, step, seg_steps))
+
+        # Pixels are at most half a pixel away from the segment, the closest one is within this window
+        radius = np.sqrt(np.maximum((closest_dist + 0.5) ** 2 - perp2, 0.) / safe_norm2)
+        k_low = np.clip(np.floor(t_proj - radius) - 1, 0, seg_steps).astype(np.int64)
+        k_high = np.clip(np.ceil(t_proj + radius) + 1, 0, seg_steps).astype(np.int64)
+
+        window = (k_high - k_low + 1).ravel()
+        group = np.repeat(np.arange(window.shape[0]), window)
+        group_offsets = np.cumsum(window) - window
+        k = (np.arange(group.shape[0]) - group_offsets[group] + k_low.ravel()[group]).astype(np.float64)
+
+        seg_index, com_index = np.divmod(group, num_com)
+        distance2 = self.__pixel_distance2(
+            k,
+            seg_start[seg_index, 0],
+            seg_end[seg_index, 0],
+            step[seg_index, 0],
+            seg_steps[seg_index, 0],
+            self.com_points[com_index]
+        )
+        min_distance2 = np.minimum.reduceat(distance2, group_offsets).reshape(num_paths, -1, num_com)
+        return np.sqrt(min_distance2.min(axis=1))
+
+    def com_cost(self, waypoints):
+        """
+        Returns the COM term of cost_func2 for every path
+
+        Args:
+            waypoints (array): (N, W, 2) integer waypoints, including start and end, of N paths
+
+        Returns:
+            array: N sums of the obstacle weights divided by their distance to the path
+        """
+        with np.errstate(divide='ignore'):
+            return np.sum(self.com_weights / self.min_distances(waypoints), axis=1)
+
+    def __pixel_distance2(self, k, seg_start, seg_end, step, seg_steps, com_points=None):
+        # Same arithmetic as rasterize_polylines, pixel k of a segment is round(k * step + start)
+        pixels = k[..., None] * step + seg_start
+        pixels = np.where((k == seg_steps)[..., None], seg_end, pixels).round()
+        if com_points is None:
+            com_points = self.com_points[None]
+        return np.sum((pixels - com_points) ** 2, axis=-1)
@@ -0,0 +1,107 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from .cache import LRUCache, get_map_fingerprint
+
+_COMPONENT_CACHE = LRUCache(maxsize=16)
+
+
+class Components(NamedTuple):
+    """
+    8-connected obstacle components of a map, in order of their first pixel in raster order.
+
+    labels holds 0 for free cells and i + 1 for cells of component i,
+    centroids the mean [x, y] of every component, counts its number of cells and
+    bboxes its [min_x, min_y, max_x, max_y] bounding box.
+    """
+    labels: np.ndarray
+    centroids: np.ndarray
+    counts: np.ndarray
+    bboxes: np.ndarray
+
+
+def label_obstacles(curr_map, use_cache=True):
+    """
+    Returns the 8-connected components of the obstacle (zero) cells of a map
+
+    The obstacle cells are split into horizontal runs, runs of neighbouring rows that touch are
+    merged with a union-find and all statistics are accumulated per run, so the cost is linear
+    in the number of runs plus one pass over the map.
+    Results are cached per map content.
+
+    Args:
+        curr_map (array): array of pixels containing obstacles
+        use_cache (bool): reuse and store the result in the per-map cache
+
+    Returns:
+        Components: labels, centroids, counts and bounding boxes
+    """
+    if not use_cache:
+        return _label_obstacles(curr_map)
+    return _COMPONENT_CACHE.get_or_create(get_map_fingerprint(curr_map), lambda: _label_obstacles(curr_map))
+
+
+def _label_obstacles(curr_map):
+    height, width = curr_map.shape
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = curr_map == 0
+    edges = np.diff(padded, axis=1)
+    run_rows, run_starts = np.nonzero(edges == 1)
+    _, run_ends = np.nonzero(edges == -1)
+    num_runs = run_rows.shape[0]
+
+    # Runs of the next row touching a run (8-connectivity) form a contiguous range [low, high)
+    row_size = width + 2
+    start_keys = run_rows * row_size + run_starts
+    end_keys = run_rows * row_size + run_ends
+    low = np.searchsorted(end_keys, (run_rows + 1) * row_size + run_starts, side='left')
+    high = np.searchsorted(start_keys, (run_rows + 1) * row_size + run_ends, side='right')
+    touching = np.maximum(high - low, 0)
+    first = np.repeat(np.arange(num_runs), touching)
+    second = np.arange(first.shape[0]) - np.repeat(np.cumsum(touching) - touching, touching) + np.repeat(low, touching)
+
+    parents = list(range(num_runs))
+    for run_a, run_b in zip(first.tolist(), second.tolist()):
+        root_a = _find(parents, run_a)
+        root_b = _find(parents, run_b)
+        if root_a != root_b:
+            # keep the earlier run as root so components are ordered by their first pixel
+            if root_a < root_b:
+                parents[root_b] = root_a
+            else:
+                parents[root_a] = root_b
+    roots = np.array([_find(parents, run) for run in range(num_runs)], dtype=np.int64)
+
+    root_ids, run_components = np.unique(roots, return_inverse=True)
+    num_components = root_ids.shape[0]
+    run_counts = run_ends - run_starts
+    counts = np.bincount(run_components, weights=run_counts, minlength=num_components).astype(np.int64)
+    sum_x = np.bincount(run_components, weights=(run_starts + run_ends - 1) * run_counts / 2, minlength=num_components)
+    sum_y = np.bincount(run_components, weights=run_rows * run_counts, minlength=num_components)
+    centroids = np.stack((sum_x, sum_y), axis=1) / counts.reshape(-1, 1) if num_components else np.zeros((0, 2))
+
+    bboxes = np.empty((num_components, 4), dtype=np.int64)
+    bboxes[:, :2] = np.iinfo(np.int64).max
+    bboxes[:, 2:] = -1
+    np.minimum.at(bboxes[:, 0], run_components, run_starts)
+    np.minimum.at(bboxes[:, 1], run_components, run_rows)
+    np.maximum.at(bboxes[:, 2], run_components, run_ends - 1)
+    np.maximum.at(bboxes[:, 3], run_components, run_rows)
+
+    marks = np.zeros((height, width + 1), dtype=np.int32)
+    marks[run_rows, run_starts] = run_components + 1
+    marks[run_rows, run_ends] = -(run_components + 1)
+    labels = np.cumsum(marks, axis=1, dtype=np.int32)[:, :-1]
+
+    components = Components(labels, centroids, counts, bboxes)
+    for array in components:
+        array.flags.writeable = False
+    return components
+
+
+def _find(parents, run):
+    while parents[run] != run:
+        parents[run] = parents[parents[run]]
+        run = parents[run]
+    return run
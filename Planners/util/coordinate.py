@@ -6,15 +6,21 @@
 import numpy as np
 
 
-class Coordinate:
+class CoordinateConfig:
+    """
+    Configuration shared by all coordinates of a population: boundaries, generator, cost function
+    and initialization. Held once per population instead of once per coordinate.
+    """
+
+    __slots__ = ('lower_boundary', 'upper_boundary', 'random', 'function', 'bounded_cost', 'points',
+                 'initial_particle', 'one_set', 'move_range', 'particle_initialized')
+
     def __init__(self, **kwargs) -> None:
-        """
-        Initializes a new random coordinate.
-        """
-        self.__lower_boundary = kwargs.get('lower_boundary', 0.)
-        self.__upper_boundary = kwargs.get('upper_boundary', 1.)
-        self._random = kwargs['bit_generator']
-        self._function = kwargs['function']
+        self.lower_boundary = kwargs.get('lower_boundary', 0.)
+        self.upper_boundary = kwargs.get('upper_boundary', 1.)
+        self.random = kwargs['bit_generator']
+        self.function = kwargs['function']
+        self.bounded_cost = kwargs.get('bounded_cost', False)
         self.points = kwargs.get('points', 3)
 
         if 'initial_particle' in kwargs:
@@ -28,24 +34,66 @@ class Coordinate:
             self.move_range = None
             self.particle_initialized = False
 
-        self.__value = None
-        self.__position = None
-        self._initialize()
-
-    def _initialize(self) -> None:
+    def initial_position(self) -> np.ndarray:
         """
-        Initialize a new random position and its value
+        Draw the position of a new coordinate, within the boundaries: around the initial particle
+        if one is set, the first draw of a population being the initial particle itself,
+        uniformly otherwise. Shared by the coordinates and the array-backed population engines.
         """
+        dimension = self.points * 2
         if self.particle_initialized:
             if self.one_set[0]:
                 print('One particle set without change')
-                self._position = self.initial_particle.copy()
                 self.one_set[0] = False
+                position = self.initial_particle
             else:
-                self._position = self.initial_particle + self._random.uniform(-self.move_range, self.move_range, self.points*2)
-                self._position = np.clip(self._position, self.__lower_boundary, self.__upper_boundary)
+                position = self.initial_particle + self.random.uniform(-self.move_range, self.move_range, dimension)
         else:
-            self._position = self._random.uniform(self.__lower_boundary, self.__upper_boundary, self.points*2)
+            position = self.random.uniform(self.lower_boundary, self.upper_boundary, dimension)
+        return np.clip(position, self.lower_boundary, self.upper_boundary)
+
+
+class Coordinate:
+    """
+    A position and its value. Coordinates only hold their own state,
+    everything shared by a population is in their config.
+    """
+
+    __slots__ = ('_config', '__position', '__value')
+
+    # The config class of the coordinate type, subclasses extend it with their parameters
+    config_class = CoordinateConfig
+
+    def __init__(self, **kwargs) -> None:
+        """
+        Initializes a new random coordinate.
+        Pass config to share a config_class instance between coordinates,
+        otherwise one is created from the keyword arguments.
+        """
+        config = kwargs.get('config', None)
+        self._config = config if config is not None else self.config_class(**kwargs)
+
+        self.__value = None
+        self.__position = None
+        self._initialize()
+
+    @property
+    def points(self) -> int:
+        return self._config.points
+
+    @property
+    def _random(self) -> np.random.Generator:
+        return self._config.random
+
+    @property
+    def _function(self):
+        return self._config.function
+
+    def _initialize(self) -> None:
+        """
+        Initialize a new random position and its value
+        """
+        self._position = self._config.initial_position()
 
     @property
     def position(self) -> np.ndarray:
@@ -73,13 +121,53 @@ class Coordinate:
         Args:
             new_pos (numpy.ndarray): The new coordinate position
         """
-        self.__position = np.clip(new_pos, a_min=self.__lower_boundary, a_max=self.__upper_boundary)
-        self.__value = self._function(self.__position)
+        self.__position = np.clip(new_pos, a_min=self._config.lower_boundary, a_max=self._config.upper_boundary)
+        self.__value = self._config.function(self.__position)
 
     @property
     def value(self) -> float:
         return self.__value
 
+    def clip(self, new_pos: np.ndarray) -> np.ndarray:
+        """
+        Clip a position to the coordinate's boundaries.
+
+        Args:
+            new_pos (numpy.ndarray): The position to clip
+
+        Returns:
+            numpy.ndarray: the clipped position
+        """
+        return np.clip(new_pos, a_min=self._config.lower_boundary, a_max=self._config.upper_boundary)
+
+    def evaluate(self, new_pos: np.ndarray, bound: float = None) -> float:
+        """
+        Evaluate a position without moving the coordinate.
+        With bounded cost evaluation, a value larger than bound may be returned as inf.
+
+        Args:
+            new_pos (numpy.ndarray): The position to evaluate
+            bound (float): Only values up to bound are of interest, None if all are
+
+        Returns:
+            float: the value of the position
+        """
+        if bound is None or not self._config.bounded_cost:
+            return self._config.function(new_pos)
+        return self._config.function(new_pos, bound=bound)
+
+    def assign(self, new_pos: np.ndarray, value: float) -> None:
+        """
+        Set a clipped position whose value was already computed,
+        e.g. by a batch cost function, without evaluating it again.
+
+        Args:
+            new_pos (numpy.ndarray): The new, clipped coordinate position
+            value (float): The value of the new position
+        """
+        self.__position = new_pos
+        self.__value = value
+
     def __eq__(self, other) -> bool:
         return self.__value == other.value
 
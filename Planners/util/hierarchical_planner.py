@@ -0,0 +1,136 @@
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from ..helper import linear_interpolation
+from .map_context import MapContext
+
+
+class LevelResult(NamedTuple):
+    """
+    Outcome of one level of a HierarchicalPlanner query: the shape of the level's map,
+    the best particle and its value, the corridor the particle was searched in and the time taken
+    """
+    map_shape: tuple
+    particle: np.ndarray
+    value: float
+    lower_boundary: np.ndarray
+    upper_boundary: np.ndarray
+    time_taken: float
+
+
+class HierarchicalPlanner:
+    """
+    Coarse-to-fine planner over the levels of a map pyramid.
+
+    Every level runs its own optimizer (PSOProblem, GWOProblem, ABCProblem, ...) on a downscaled
+    map. Particles hold points scaled to [0, 1] of the map, so the best particle of a level is
+    directly the initial particle of the next one, and the next level only searches a corridor
+    of +-corridor around it. The first level can be seeded from Q-learning like the notebooks.
+    The particle of the last level is turned into a path on the full map.
+
+    Each entry of levels is a dict with the optimizer and its optimizer_params, which level of the
+    pyramid to plan on, given by allowed_loss or resize (the closest pyramid scale), or neither for
+    the full map, and optionally its own corridor.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Args:
+            map (array): array of pixels containing obstacles
+            levels (list): level dicts, coarse to fine
+            cost_func_wt (list): weights of the cost function
+            use_com (bool): use cost_func2 with the obstacle centre of mass term
+            corridor (float): half width of the search corridor around the previous level's particle
+            resize_step (float): resize step of the map pyramid
+            initial_particle (dict): MapContext.initial_particle arguments to seed the first level
+                from Q-learning, or None to search the whole first level
+            batch_cost (bool): evaluate whole populations with the batched cost functions
+            context (MapContext): context of the map, created if not given
+        """
+        self.map = kwargs['map']
+        self.levels = kwargs['levels']
+        self.cost_func_wt = kwargs['cost_func_wt']
+        self.use_com = kwargs.get('use_com', True)
+        self.corridor = kwargs.get('corridor', 0.1)
+        self.resize_step = kwargs.get('resize_step', 0.05)
+        self.initial_particle = kwargs.get('initial_particle', None)
+        self.batch_cost = kwargs.get('batch_cost', False)
+        self.context = kwargs.get('context', None)
+        if self.context is None:
+            self.context = MapContext(self.map)
+        self.level_results = list()
+        self.__level_contexts = dict()
+
+    def get_level_map(self, level):
+        """
+        Returns the map a level plans on
+        """
+        pyramid = self.context.pyramid(self.resize_step)
+        if 'allowed_loss' in level:
+            return pyramid.resized_map(level['allowed_loss']).map
+        if level.get('resize', 1) < 1:
+            index = int(np.argmin(np.abs(np.array(pyramid.scales) - level['resize'])))
+            return pyramid.level(index).map
+        return self.map
+
+    def get_path(self, start, end):
+        """
+        Plans a query through every level and returns the path on the full map.
+        The result of every level is kept in level_results.
+        """
+        start = np.asarray(start)
+        end = np.asarray(end)
+        full_size = np.array(self.map.shape[::-1]) - 1
+        self.level_results = list()
+
+        seed = None
+        if self.initial_particle is not None:
+            _, seed = self.context.initial_particle(start, end, **self.initial_particle)
+
+        for level in self.levels:
+            start_time = time.perf_counter()
+            level_map = self.get_level_map(level)
+            level_size = np.array(level_map.shape[::-1]) - 1
+            level_start = np.round(start * level_size / full_size).astype(np.int32)
+            level_end = np.round(end * level_size / full_size).astype(np.int32)
+
+            optimizer_params = dict(level['optimizer_params'])
+            map_lower = lower_boundary = optimizer_params.get('lower_boundary', 0.)
+            map_upper = upper_boundary = optimizer_params.get('upper_boundary', 1.)
+            if seed is not None:
+                corridor = level.get('corridor', self.corridor)
+                lower_boundary = np.clip(seed - corridor, map_lower, map_upper)
+                upper_boundary = np.clip(seed + corridor, map_lower, map_upper)
+                optimizer_params.update(
+                    points=seed.shape[0] // 2,
+                    initial_particle=seed,
+                    lower_boundary=lower_boundary,
+                    upper_boundary=upper_boundary
+                )
+
+            planner = self.__get_planner(level_map, level['optimizer'], optimizer_params)
+            best_sol = planner.solve(level_start, level_end)
+            seed = np.array(best_sol.position)
+            self.level_results.append(LevelResult(
+                level_map.shape, seed, best_sol.value, lower_boundary, upper_boundary,
+                time.perf_counter() - start_time))
+
+        points = (seed.reshape(-1, 2) * full_size).astype(np.int32)
+        return linear_interpolation(start, end, points)
+
+    def __get_planner(self, level_map, optimizer, optimizer_params):
+        planner_params = dict(
+            optimizer=optimizer,
+            optimizer_params=optimizer_params,
+            cost_func_wt=self.cost_func_wt,
+            batch_cost=self.batch_cost
+        )
+        if level_map is self.map:
+            context = self.context
+        else:
+            context = self.__level_contexts.get(level_map.shape)
+            if context is None:
+                context = self.__level_contexts[level_map.shape] = MapContext(level_map)
+        return context.get_planner(use_com=self.use_com, **planner_params)
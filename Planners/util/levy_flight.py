@@ -22,19 +22,28 @@ def levy_flight(start: np.ndarray, low_step: float, high_step: float, high_step_
     Returns:
         numpy.ndarray -- The new position
     """
-    total_points = len(start) // 2
-    point_change = list()
-
-    for _ in range(total_points):
-        if gen.random() <= high_step_prob:
-            step_size = high_step
-        else:
-            step_size = low_step
-        u = gen.random(2)
-        u_hat = u / np.linalg.norm(u)
-        v = u * step_size
-
-        point_change.append(v[0])
-        point_change.append(v[1])
-
-    return start + np.array(point_change)
+    return levy_flights(start[np.newaxis], low_step, high_step, high_step_prob, gen)[0]
+
+
+def levy_flights(starts: np.ndarray, low_step: float, high_step: float, high_step_prob: float, gen: np.random.Generator) -> np.ndarray:
+    """
+    Perform a Lévy flight step from every start position with one draw of random numbers.
+
+    Per point, the random numbers are consumed in the order of a loop over the points of every start:
+    one to choose the step size, then two for the move. levy_flight is the single position case.
+
+    Arguments:
+        starts {numpy.ndarray} -- (N, 2*points) start positions
+        low_step {float} -- step size of the low step
+        high_step {float} -- step size of the low step
+        high_step_prob -- probability of high step
+        gen {Generator} -- the generator used to generate pseudo random numbers
+
+    Returns:
+        numpy.ndarray -- The (N, 2*points) new positions
+    """
+    total_points = starts.shape[1] // 2
+    random_numbers = gen.random((starts.shape[0], total_points, 3))
+    step_sizes = np.where(random_numbers[:, :, 0] <= high_step_prob, high_step, low_step)
+    point_changes = random_numbers[:, :, 1:] * step_sizes[:, :, np.newaxis]
+    return starts + point_changes.reshape(starts.shape[0], total_points * 2)
@@ -0,0 +1,155 @@
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from map_resize.map_pyramid import get_map_pyramid
+from map_resize.map_resize import get_resized_map, get_core_points, points_to_particle
+from qlearning.q_table_store import QTableStore
+from qlearning.qlearning import QLearningPathPlanner
+from ..helper import get_com_points
+from .cache import LRUCache, get_map_fingerprint
+from .com_index import ComIndex
+from .components import label_obstacles
+from .planner_base import PlannerBase
+
+
+class PlanResult(NamedTuple):
+    start: np.ndarray
+    end: np.ndarray
+    path: np.ndarray
+    time_taken: float
+
+
+class MapContext:
+    """
+    Long-lived owner of a map and of the artifacts derived from it.
+
+    Every per-map artifact (downsampled map, obstacle components, centre of mass index,
+    occupancy bitmaps) is built on first use and kept for the lifetime of the context, so many
+    (start, goal) queries against the same map only pay for the work that depends on the query.
+    The per-query Q-learning initial particles are kept in a separate size-bounded cache, they
+    never evict the per-map artifacts. The trained Q-tables are kept in a QTableStore,
+    Q-learning for a new goal starts from the one of the nearest goal already trained.
+    """
+
+    def __init__(self, curr_map, cache_size=16, q_table_store=None):
+        self.map = curr_map
+        self.fingerprint = get_map_fingerprint(curr_map)
+        # Per-map artifacts by kind and parameters, a handful per map
+        self.artifacts = dict()
+        # Per-query results, cache_size of them
+        self.cache = LRUCache(maxsize=cache_size)
+        self.q_table_store = q_table_store if q_table_store is not None else QTableStore()
+
+    def __get(self, key, factory):
+        if key not in self.artifacts:
+            self.artifacts[key] = factory()
+        return self.artifacts[key]
+
+    def resized_map(self, allowed_loss=0.1, resize_step=0.1):
+        """
+        Returns get_resized_map(map, allowed_loss, resize_step): (map, loss, resize factor)
+        """
+        return self.__get(('resized_map', allowed_loss, resize_step),
+                          lambda: get_resized_map(self.map, allowed_loss, resize_step))
+
+    def pyramid(self, resize_step=0.1):
+        """
+        Returns the MapPyramid of the map, levels at the resize factors resize_step, 2*resize_step, ... 1
+        """
+        return self.__get(('pyramid', resize_step), lambda: get_map_pyramid(self.map, resize_step))
+
+    def components(self):
+        """
+        Returns the 8-connected obstacle components of the map
+        """
+        return self.__get(('components',), lambda: label_obstacles(self.map))
+
+    def com_points(self):
+        """
+        Returns the obstacle centre of mass points and weights, as get_com_points
+        """
+        return self.__get(('com_points',), lambda: get_com_points(self.map))
+
+    def com_index(self):
+        """
+        Returns the ComIndex of the obstacle centre of mass points
+        """
+        return self.__get(('com_index',), lambda: ComIndex(*self.com_points()))
+
+    def occupancy(self, packed=False):
+        """
+        Returns the free cell bitmap of the map, bit-packed along rows if packed is True
+        """
+        def build():
+            free = self.map != 0
+            return np.packbits(free, axis=1) if packed else free
+        return self.__get(('occupancy', packed), build)
+
+    def initial_particle(self, start, end, allowed_loss=0.05, resize_step=0.01, episodes=500,
+                         min_point_separation=0.05, patience=None):
+        """
+        Returns the core points and the initial particle of the hybrid pipeline for a query:
+        Q-learning on the downsampled map, core points of its path, scaled to a particle
+
+        Args:
+            start (array): start position on the full map
+            end (array): goal position on the full map
+            allowed_loss (float): allowed loss of the downsampled map
+            resize_step (float): resize step of the downsampled map
+            episodes (int): Q-learning episodes
+            min_point_separation (float): minimum core point separation relative to the mean map size
+            patience (int): stop Q-learning once its greedy path stayed the same for patience episodes
+        """
+        def build():
+            comp_map, _, resize_factor = self.resized_map(allowed_loss, resize_step)
+            new_start = np.round(np.asarray(start) * resize_factor).astype(np.int32)
+            new_end = np.round(np.asarray(end) * resize_factor).astype(np.int32)
+            q_planner = QLearningPathPlanner(comp_map, new_start, new_end, episodes=episodes,
+                                             q_table_store=self.q_table_store, patience=patience)
+            q_planner.train()
+            crude_path = q_planner.get_path()
+            core_points = get_core_points(crude_path, np.mean(comp_map.shape) * min_point_separation)
+            return core_points, points_to_particle(core_points, comp_map.shape)
+
+        key = ('initial_particle', tuple(np.asarray(start).tolist()), tuple(np.asarray(end).tolist()),
+               allowed_loss, resize_step, episodes, min_point_separation, patience)
+        return self.cache.get_or_create(key, build)
+
+    def get_planner(self, use_com=True, **planner_params):
+        """
+        Returns a PlannerBase on this map, sharing the centre of mass index of the context
+
+        Args:
+            use_com (bool): use cost_func2 with the obstacle centre of mass term
+            planner_params: optimizer, optimizer_params, cost_func_wt and other PlannerBase arguments
+        """
+        if use_com:
+            com_points, com_weights = self.com_points()
+            return PlannerBase(map=self.map, com_points=com_points, com_weights=com_weights,
+                               com_index=self.com_index(), **planner_params)
+        return PlannerBase(map=self.map, **planner_params)
+
+    def plan_many(self, queries, planner=None, **planner_params):
+        """
+        Plans every (start, end) query against this map with one planner
+
+        Args:
+            queries (iterable): (start, end) pairs
+            planner: object with a get_path(start, end) method, built with get_planner if not given
+            planner_params: arguments of get_planner
+
+        Returns:
+            list: a PlanResult with the path and the time taken for every query
+        """
+        if planner is None:
+            planner = self.get_planner(**planner_params)
+        results = list()
+        for start, end in queries:
+            start = np.asarray(start)
+            end = np.asarray(end)
+            start_time = time.perf_counter()
+            path = planner.get_path(start, end)
+            results.append(PlanResult(start, end, path, time.perf_counter() - start_time))
+        return results
@@ -0,0 +1,149 @@
+import os
+import tempfile
+from multiprocessing import shared_memory
+from typing import NamedTuple
+
+import numpy as np
+
+# Layers this process attached to, by location
+_ATTACHED_LAYERS = dict()
+
+
+class MapHandle(NamedTuple):
+    """
+    Picklable reference to a layer of a MapStore, attach with attach_map in any process
+    """
+    key: object
+    location: str
+    shape: tuple
+    dtype: str
+    memmap: bool
+
+
+class MapStore:
+    """
+    Owner of maps and derived layers shared between processes.
+
+    Every layer is copied once into a multiprocessing.shared_memory segment, or a memory-mapped
+    .npy file if the store has a directory (True for a temporary one), and handed out as a
+    read-only view: worker processes attach to it with attach_map instead of receiving a pickled
+    copy, so all of them share one copy of the pages. The planners keep the views they are given
+    without copying them.
+
+    Keys are any hashable, derived layers are stored next to their map:
+
+        with MapStore() as store:
+            map_handle = store.put('map_1', curr_map)
+            occupancy_handle = store.put(('map_1', 'occupancy'), context.occupancy())
+
+    The store removes its segments and files on close, use it as a context manager. Views attached
+    in other processes must not be used after that.
+    """
+
+    def __init__(self, directory=None) -> None:
+        self.directory = directory
+        self.__owned_directory = None
+        self.__segments = dict()
+        self.__views = dict()
+        self.__handles = dict()
+
+    def put(self, key, curr_map) -> MapHandle:
+        """
+        Copies a map or layer into the store under key, replacing an earlier one
+
+        Returns:
+            MapHandle: the handle workers attach with
+        """
+        curr_map = np.asarray(curr_map)
+        if key in self.__handles:
+            self.__remove(key)
+        if self.directory is None:
+            segment = shared_memory.SharedMemory(create=True, size=max(curr_map.nbytes, 1))
+            view = np.ndarray(curr_map.shape, dtype=curr_map.dtype, buffer=segment.buf)
+            location, memmap = segment.name, False
+        else:
+            segment = None
+            location, memmap = self.__file_name(key), True
+            view = np.lib.format.open_memmap(location, mode='w+', dtype=curr_map.dtype, shape=curr_map.shape)
+        view[...] = curr_map
+        if memmap:
+            view.flush()
+        view.flags.writeable = False
+        handle = MapHandle(key, location, curr_map.shape, curr_map.dtype.str, memmap)
+        self.__segments[key] = segment
+        self.__views[key] = view
+        self.__handles[key] = handle
+        return handle
+
+    def get(self, key) -> np.ndarray:
+        """
+        Returns the read-only view of the layer stored under key
+        """
+        return self.__views[key]
+
+    def handle(self, key) -> MapHandle:
+        return self.__handles[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self.__handles
+
+    def __file_name(self, key) -> str:
+        directory = self.directory
+        if directory is True:
+            if self.__owned_directory is None:
+                self.__owned_directory = tempfile.mkdtemp(prefix='map_store_')
+            directory = self.__owned_directory
+        else:
+            os.makedirs(directory, exist_ok=True)
+        safe_key = ''.join(char if char.isalnum() or char in '-_' else '_' for char in str(key))
+        return os.path.join(directory, '%s_%d.npy' % (safe_key, len(self.__handles)))
+
+    def __remove(self, key) -> None:
+        segment = self.__segments.pop(key)
+        handle = self.__handles.pop(key)
+        # the view is dropped before the segment is closed, it exports the segment's buffer
+        del self.__views[key]
+        if segment is not None:
+            try:
+                segment.close()
+            except BufferError:
+                # views handed out are still referenced, the memory is released with them
+                pass
+            segment.unlink()
+        else:
+            try:
+                os.remove(handle.location)
+            except FileNotFoundError:
+                pass
+
+    def close(self) -> None:
+        """
+        Removes every segment and file of the store
+        """
+        for key in list(self.__handles):
+            self.__remove(key)
+        if self.__owned_directory is not None:
+            os.rmdir(self.__owned_directory)
+            self.__owned_directory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def attach_map(handle: MapHandle) -> np.ndarray:
+    """
+    Returns a read-only view of a layer of a MapStore, attaching to it once per process
+    """
+    if handle.location not in _ATTACHED_LAYERS:
+        if handle.memmap:
+            segment = None
+            view = np.load(handle.location, mmap_mode='r')
+        else:
+            segment = shared_memory.SharedMemory(name=handle.location)
+            view = np.ndarray(handle.shape, dtype=np.dtype(handle.dtype), buffer=segment.buf)
+            view.flags.writeable = False
+        _ATTACHED_LAYERS[handle.location] = (segment, view)
+    return _ATTACHED_LAYERS[handle.location][1]
@@ -1,42 +1,189 @@
-from ..helper import linear_interpolation, cost_func, cost_func2
+import time
+
+from ..helper import linear_interpolation, cost_func, cost_func2, batch_cost_func, batch_cost_func2
+from .cache import LRUCache
+from .com_index import ComIndex
+from .stats import PlannerStats
 import numpy as np
 
+# The cost function builders take a PlannerStats to time the functions they call, without one
+# the closures call the helper functions directly
+
+
+def get_cost_function(curr_map, start, end, cost_func_wt, stats=None):
+    interpolate = linear_interpolation if stats is None else stats.timed('linear_interpolation', linear_interpolation)
+    cost_function = cost_func if stats is None else stats.timed('cost_func', cost_func)
 
-def get_cost_function(curr_map, start, end, cost_func_wt):
-    def curr_cost_func(particles):
+    def curr_cost_func(particles, bound=None):
         points = particles.reshape(-1, 2)
         points = (points * (np.array(curr_map.shape[::-1]) - 1)).astype(np.int32)
-        path = linear_interpolation(start, end, points)
-        cost = cost_func(path, curr_map, cost_func_wt[0], cost_func_wt[1])
+        path = interpolate(start, end, points)
+        cost = cost_function(path, curr_map, cost_func_wt[0], cost_func_wt[1], bound=bound)
         return cost
     return curr_cost_func
 
 
-def get_cost_function2(curr_map, start, end, cost_func_wt, com_points, com_weights):
-    def curr_cost_func(particles):
+def get_cost_function2(curr_map, start, end, cost_func_wt, com_points, com_weights, com_index=None, stats=None):
+    interpolate = linear_interpolation if stats is None else stats.timed('linear_interpolation', linear_interpolation)
+    cost_function = cost_func2 if stats is None else stats.timed('cost_func2', cost_func2)
+
+    def curr_cost_func(particles, bound=None):
         points = particles.reshape(-1, 2)
         points = (points * (np.array(curr_map.shape[::-1]) - 1)).astype(np.int32)
-        path = linear_interpolation(start, end, points)
-        cost = cost_func2(path, curr_map, com_points, com_weights, cost_func_wt[0], cost_func_wt[1], cost_func_wt[2])
+        path = interpolate(start, end, points)
+        com_cost = None
+        if com_index is not None:
+            waypoints = np.concatenate(([start], points, [end]))
+            com_cost = com_index.com_cost(waypoints[None])[0]
+        cost = cost_function(path, curr_map, com_points, com_weights, cost_func_wt[0], cost_func_wt[1], cost_func_wt[2],
+                             com_cost=com_cost, bound=bound)
+        return cost
+    return curr_cost_func
+
+
+def get_batch_cost_function(curr_map, start, end, cost_func_wt, stats=None):
+    cost_function = batch_cost_func if stats is None else stats.timed('batch_cost_func', batch_cost_func)
+
+    def curr_batch_cost_func(particles, bound=None):
+        points = particles.reshape(particles.shape[0], -1, 2)
+        points = (points * (np.array(curr_map.shape[::-1]) - 1)).astype(np.int32)
+        return cost_function(start, end, points, curr_map, cost_func_wt[0], cost_func_wt[1], bound=bound)
+    return curr_batch_cost_func
+
+
+def get_batch_cost_function2(curr_map, start, end, cost_func_wt, com_points, com_weights, com_index=None, stats=None):
+    cost_function = batch_cost_func2 if stats is None else stats.timed('batch_cost_func2', batch_cost_func2)
+
+    def curr_batch_cost_func(particles, bound=None):
+        points = particles.reshape(particles.shape[0], -1, 2)
+        points = (points * (np.array(curr_map.shape[::-1]) - 1)).astype(np.int32)
+        return cost_function(start, end, points, curr_map, com_points, com_weights,
+                             cost_func_wt[0], cost_func_wt[1], cost_func_wt[2], com_index=com_index, bound=bound)
+    return curr_batch_cost_func
+
+
+def get_cached_cost_function(cost_function, cost_cache, curr_map, start, end):
+    """
+    Returns cost_function behind a cache keyed on the query and the integer waypoints of a particle,
+    which are all the cost depends on. Values cut off by a bound are not cached.
+    """
+    scale = np.array(curr_map.shape[::-1]) - 1
+    query = (tuple(np.asarray(start).tolist()), tuple(np.asarray(end).tolist()))
+
+    def curr_cost_func(particles, bound=None):
+        points = (particles.reshape(-1, 2) * scale).astype(np.int32)
+        key = (query, points.tobytes())
+        cost = cost_cache.get(key)
+        if cost is None:
+            cost = cost_function(particles, bound=bound)
+            if bound is None or cost != np.inf:
+                cost_cache.put(key, cost)
         return cost
     return curr_cost_func
 
 
+def get_cached_batch_cost_function(batch_function, cost_cache, curr_map, start, end):
+    """
+    Returns batch_function behind a cache like get_cached_cost_function,
+    the particles missing from the cache are scored with one batch_function call
+    """
+    scale = np.array(curr_map.shape[::-1]) - 1
+    query = (tuple(np.asarray(start).tolist()), tuple(np.asarray(end).tolist()))
+
+    def curr_batch_cost_func(particles, bound=None):
+        points = (particles.reshape(particles.shape[0], -1, 2) * scale).astype(np.int32)
+        costs = np.empty(particles.shape[0])
+        # rows of every missing key, particles with the same waypoints are scored once
+        missing = dict()
+        for index, row in enumerate(points):
+            key = (query, row.tobytes())
+            cost = cost_cache.get(key)
+            if cost is None:
+                missing.setdefault(key, list()).append(index)
+            else:
+                costs[index] = cost
+        if not missing:
+            return costs
+
+        first_rows = [indices[0] for indices in missing.values()]
+        bounds = None
+        if bound is not None:
+            bound = np.broadcast_to(bound, particles.shape[0])
+            bounds = np.array([bound[indices].max() for indices in missing.values()])
+        values = batch_function(particles[first_rows], bound=bounds)
+        for (key, indices), value in zip(missing.items(), values):
+            costs[indices] = value
+            if bounds is None or value != np.inf:
+                cost_cache.put(key, value)
+        return costs
+    return curr_batch_cost_func
+
+
+def particle_to_path(curr_map, start, end, particle):
+    """
+    Returns the path of a particle: its points scaled from [0, 1] to the map, interpolated from start to end
+    """
+    points = particle.reshape(-1, 2)
+    points = (points * (np.array(curr_map.shape[::-1]) - 1)).astype(np.int32)
+    return linear_interpolation(start, end, points)
+
+
+def chain_iteration_callbacks(first, second):
+    """
+    Returns an iteration callback calling both callbacks, which asks to stop if either of them does
+    """
+    if first is None:
+        return second
+
+    def iteration_callback(iteration, best_position):
+        stop = first(iteration, best_position)
+        return second(iteration, best_position) or stop
+    return iteration_callback
+
+
 class PlannerBase:
     def __init__(self, **kwargs):
         self.map = kwargs['map']
         self.optimizer_params = kwargs['optimizer_params']
         self.optimizer = kwargs['optimizer']
         self.cost_func_wt = kwargs['cost_func_wt']
+        self.batch_cost = kwargs.get('batch_cost', False)
         self.function2 = False
         if 'com_points' in kwargs:
             self.com_points = kwargs['com_points']
             self.com_weights = kwargs['com_weights']
             self.function2 = True
+            # Built once and shared by every cost function of this planner
+            self.com_index = kwargs.get('com_index', None)
+            if self.com_index is None:
+                self.com_index = ComIndex(self.com_points, self.com_weights)
         if 'initial_particle' in self.optimizer_params:
             self.optimizer_params['one_set'] = [True]
+        # Costs by query and integer waypoints, shared by every query of this planner
+        cost_cache_size = kwargs.get('cost_cache_size', 0)
+        self.cost_cache = LRUCache(maxsize=cost_cache_size) if cost_cache_size else None
+        # With stats, every query collects a PlannerStats, kept in self.stats and on the solution of solve
+        self.collect_stats = kwargs.get('stats', False)
+        self.stats = None
 
-    def get_path(self, start, end):
+    @property
+    def cost_cache_hits(self):
+        return self.cost_cache.hits if self.cost_cache is not None else 0
+
+    @property
+    def cost_cache_misses(self):
+        return self.cost_cache.misses if self.cost_cache is not None else 0
+
+    def solve(self, start, end, iteration_callback=None):
+        """
+        Runs the optimizer for a query and returns its best solution,
+        a particle of points scaled to [0, 1] of the map
+
+        iteration_callback is called after every iteration besides the one of optimizer_params,
+        the optimizer stops early if either returns True
+        """
+        stats = PlannerStats() if self.collect_stats else None
+        self.stats = stats
         if self.function2:
             cost_function = get_cost_function2(
                 self.map,
@@ -44,22 +191,76 @@ class PlannerBase:
                 end,
                 self.cost_func_wt,
                 self.com_points,
-                self.com_weights
+                self.com_weights,
+                self.com_index,
+                stats
             )
         else:
             cost_function = get_cost_function(
                 self.map,
                 start,
                 end,
-                self.cost_func_wt
+                self.cost_func_wt,
+                stats
             )
 
-        opt = self.optimizer(**self.optimizer_params, function=cost_function)
-        best_sol = opt.solve()
+        batch_params = dict()
+        if self.batch_cost:
+            if self.function2:
+                batch_params['batch_function'] = get_batch_cost_function2(
+                    self.map,
+                    start,
+                    end,
+                    self.cost_func_wt,
+                    self.com_points,
+                    self.com_weights,
+                    self.com_index,
+                    stats
+                )
+            else:
+                batch_params['batch_function'] = get_batch_cost_function(
+                    self.map,
+                    start,
+                    end,
+                    self.cost_func_wt,
+                    stats
+                )
 
-        particles = best_sol.position
-        points = particles.reshape(-1, 2)
-        points = (points * (np.array(self.map.shape[::-1]) - 1)).astype(np.int32)
-        path = linear_interpolation(start, end, points)
+        if self.cost_cache is not None:
+            cost_function = get_cached_cost_function(cost_function, self.cost_cache, self.map, start, end)
+            if 'batch_function' in batch_params:
+                batch_params['batch_function'] = get_cached_batch_cost_function(
+                    batch_params['batch_function'], self.cost_cache, self.map, start, end)
+
+        optimizer_params = self.optimizer_params
+        if iteration_callback is not None:
+            optimizer_params = dict(optimizer_params, iteration_callback=chain_iteration_callbacks(
+                optimizer_params.get('iteration_callback', None), iteration_callback))
+
+        if stats is None:
+            opt = self.optimizer(**optimizer_params, **batch_params, function=cost_function)
+            return opt.solve()
 
-        return path
+        # invocations by the optimizer, in front of the cost cache
+        cost_function = stats.timed('cost_function', cost_function)
+        if 'batch_function' in batch_params:
+            timed_batch_function = stats.timed('batch_cost_function', batch_params['batch_function'])
+
+            def counted_batch_function(particles, bound=None):
+                stats.count('batch_cost_particles', particles.shape[0])
+                return timed_batch_function(particles, bound=bound)
+            batch_params['batch_function'] = counted_batch_function
+
+        cache_hits, cache_misses = self.cost_cache_hits, self.cost_cache_misses
+        start_time = time.perf_counter()
+        opt = self.optimizer(**optimizer_params, **batch_params, function=cost_function, stats=stats)
+        best_sol = opt.solve()
+        stats.add_time('solve', start_time)
+        if self.cost_cache is not None:
+            stats.count('cost_cache_hits', self.cost_cache_hits - cache_hits)
+            stats.count('cost_cache_misses', self.cost_cache_misses - cache_misses)
+        return best_sol
+
+    def get_path(self, start, end):
+        best_sol = self.solve(start, end)
+        return particle_to_path(self.map, start, end, best_sol.position)
@@ -4,14 +4,189 @@
 # ------------------------------------------------------------------------------------------------------
 
 from abc import ABC, abstractmethod
+import logging
+import time
+import numpy as np
 from numpy.random import default_rng
 from ..util.coordinate import Coordinate
+from ..util.solution import Solution
+from ..util.stopping import SolveProgress
+
+LOGGER = logging.getLogger(__name__)
 
 
 class ProblemBase(ABC):
     def __init__(self, **kwargs) -> None:
         self._random = default_rng(kwargs.get('seed', None))
+        # Called as iteration_callback(iteration, best_position) after every iteration,
+        # solve stops and returns the best solution so far if it returns True
         self.iteration_callback = kwargs.get('iteration_callback', None)
+        self._function = kwargs.get('function', None)
+        self._batch_function = kwargs.get('batch_function', None)
+        # The cost functions take a bound and may return inf for values larger than it
+        self._bounded_cost = kwargs.get('bounded_cost', False)
+        # PlannerStats the optimizer records its phase times and convergence in, None to not instrument
+        self.stats = kwargs.get('stats', None)
+        # StoppingCriterion list, the run ends at the first one met, see stop_reason
+        self.stopping_criteria = list(kwargs.get('stopping_criteria', ()))
+        # What ended the last solve: 'iteration_number', 'iteration_callback' or the repr of a stopping criterion
+        self.stop_reason = None
+        # Exchanges individuals with other populations every migration.interval iterations, see migrate
+        self.migration = kwargs.get('migration', None)
+        self.__evaluations = 0
+        self.__start_time = time.perf_counter()
+        if self.stopping_criteria:
+            for criterion in self.stopping_criteria:
+                criterion.reset()
+            self.__count_evaluations()
+
+    @property
+    def evaluations(self) -> int:
+        """
+        Particles scored by the cost functions, only counted if there are stopping criteria
+        """
+        return self.__evaluations
+
+    def __count_evaluations(self) -> None:
+        function, batch_function = self._function, self._batch_function
+
+        def counted_function(position, **kwargs):
+            self.__evaluations += 1
+            return function(position, **kwargs)
+
+        def counted_batch_function(positions, **kwargs):
+            self.__evaluations += positions.shape[0]
+            return batch_function(positions, **kwargs)
+
+        if function is not None:
+            self._function = counted_function
+        if batch_function is not None:
+            self._batch_function = counted_batch_function
+
+    def _agent_kwargs(self, kwargs) -> dict:
+        """
+        Returns the arguments of the agents or population engine of the problem:
+        kwargs with the problem's generator, cost functions and population evaluation
+        """
+        return dict(kwargs, function=self._function, batch_function=self._batch_function, bit_generator=self._random,
+                    evaluate=self._evaluate)
+
+    def _evaluate(self, positions: np.ndarray, bounds: np.ndarray = None) -> np.ndarray:
+        """
+        Evaluate a population of positions.
+        Uses the batch function in a single call if one was given.
+
+        Args:
+            positions (numpy.ndarray): (N, 2*points) positions
+            bounds (numpy.ndarray): N bounds, values larger than their bound may be returned as inf
+                if the problem uses bounded cost evaluation
+
+        Returns:
+            numpy.ndarray: the N values
+        """
+        if bounds is None or not self._bounded_cost:
+            if self._batch_function is not None:
+                return np.asarray(self._batch_function(positions), dtype=np.float64)
+            return np.array([self._function(position) for position in positions], dtype=np.float64)
+        if self._batch_function is not None:
+            return np.asarray(self._batch_function(positions, bound=bounds), dtype=np.float64)
+        return np.array([self._function(position, bound=bound) for position, bound in zip(positions, bounds)],
+                        dtype=np.float64)
+
+    def _end_iteration(self, iteration: int, best: Solution, get_positions) -> bool:
+        """
+        Record the iteration in stats, call the iteration callback and check the stopping criteria,
+        exchange individuals with the other populations if the run goes on and migration is due
+
+        Args:
+            iteration (int): the iteration that ended
+            best (Solution): the best solution so far
+            get_positions (callable): returns the positions of the population, only called if needed
+
+        Returns:
+            bool: True if the run stops, the reason is kept in stop_reason
+        """
+        if self.stats is not None:
+            self.stats.record_iteration(iteration, best.value, get_positions())
+        if self.iteration_callback and self.iteration_callback(iteration, best.position):
+            self.stop_reason = 'iteration_callback'
+        elif self.stopping_criteria:
+            progress = SolveProgress(iteration, best.value, self.__evaluations,
+                                     time.perf_counter() - self.__start_time, get_positions)
+            for criterion in self.stopping_criteria:
+                if criterion.should_stop(progress):
+                    self.stop_reason = repr(criterion)
+                    break
+            else:
+                self.__migrate_if_due(iteration)
+                return False
+        else:
+            self.__migrate_if_due(iteration)
+            return False
+        LOGGER.info('Stopped by %s after %i iterations', self.stop_reason, iteration+1)
+        return True
+
+    def __migrate_if_due(self, iteration: int) -> None:
+        """
+        Send the best migration.migrants individuals and take in the received ones every migration.interval iterations
+        """
+        migration = self.migration
+        if migration is not None and (iteration + 1) % migration.interval == 0:
+            self.migrate(*migration.exchange(iteration, *self.emigrants(migration.migrants)))
+
+    @abstractmethod
+    def population(self):
+        """
+        Get the positions and values of the population.
+
+        Returns:
+            tuple: (N, 2*points) positions and N values
+        """
+
+    @abstractmethod
+    def _replace_individuals(self, indices: np.ndarray, positions: np.ndarray, values: np.ndarray) -> None:
+        """
+        Replace the individuals at indices of the population by the given, already evaluated ones
+        """
+
+    def emigrants(self, number: int):
+        """
+        Get the best individuals of the population, best first.
+
+        Returns:
+            tuple: (number, 2*points) positions and their values
+        """
+        positions, values = self.population()
+        best_indices = np.argsort(values, kind='stable')[:number]
+        return positions[best_indices], values[best_indices]
+
+    def migrate(self, positions: np.ndarray, values: np.ndarray) -> int:
+        """
+        Replace the worst individuals of the population by the given ones, the best immigrant replacing
+        the worst individual, wherever the immigrant is better.
+
+        Args:
+            positions (numpy.ndarray): (M, 2*points) positions of the immigrants
+            values (numpy.ndarray): their M values
+
+        Returns:
+            int: number of individuals replaced
+        """
+        _, current_values = self.population()
+        number = min(len(values), len(current_values))
+        immigrants = np.argsort(values, kind='stable')[:number]
+        worst = np.argsort(current_values, kind='stable')[::-1][:number]
+        better = values[immigrants] < current_values[worst]
+        self._replace_individuals(worst[better], positions[immigrants[better]], values[immigrants[better]])
+        return int(np.count_nonzero(better))
+
+    def _result(self, best: Solution) -> Solution:
+        """
+        Returns the best solution to return from solve, carrying the stats and the stop reason
+        """
+        if self.stop_reason is None:
+            self.stop_reason = 'iteration_number'
+        return Solution(best.position, best.value, self.stats, self.stop_reason)
 
     @abstractmethod
     def solve(self) -> Coordinate:
@@ -0,0 +1,58 @@
+import numpy as np
+
+
+class Solution:
+    """
+    Immutable (position, value) record of a candidate solution.
+
+    Compares by value like Coordinate, so it can be used wherever an optimizer
+    used to return a copied agent. The solution returned by solve carries
+    the stop reason of the optimizer and its PlannerStats if it is instrumented.
+    """
+
+    __slots__ = ('__position', '__value', '__stats', '__stop_reason')
+
+    def __init__(self, position: np.ndarray, value: float, stats=None, stop_reason=None) -> None:
+        position = np.array(position, dtype=np.float64)
+        position.flags.writeable = False
+        self.__position = position
+        self.__value = value
+        self.__stats = stats
+        self.__stop_reason = stop_reason
+
+    @property
+    def position(self) -> np.ndarray:
+        return self.__position
+
+    @property
+    def value(self) -> float:
+        return self.__value
+
+    @property
+    def stats(self):
+        return self.__stats
+
+    @property
+    def stop_reason(self):
+        return self.__stop_reason
+
+    def __repr__(self) -> str:
+        return 'Solution(value=%r)' % (self.__value,)
+
+    def __eq__(self, other) -> bool:
+        return self.__value == other.value
+
+    def __ne__(self, other) -> bool:
+        return self.__value != other.value
+
+    def __lt__(self, other) -> bool:
+        return self.__value < other.value
+
+    def __le__(self, other) -> bool:
+        return self.__value <= other.value
+
+    def __gt__(self, other) -> bool:
+        return self.__value > other.value
+
+    def __ge__(self, other) -> bool:
+        return self.__value >= other.value
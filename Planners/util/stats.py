@@ -0,0 +1,83 @@
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+
+class IterationStats(NamedTuple):
+    """
+    Convergence of an optimizer iteration: the best value so far
+    and the mean distance of the population to its centroid
+    """
+    iteration: int
+    best_value: float
+    diversity: float
+
+
+def get_diversity(positions):
+    """
+    Returns the mean distance of the (N, 2*points) positions to their centroid
+    """
+    positions = np.asarray(positions)
+    return float(np.mean(np.linalg.norm(positions - positions.mean(axis=0), axis=1)))
+
+
+class PlannerStats:
+    """
+    Call counts, accumulated times and per iteration convergence of a planner query.
+
+    Collected when stats are enabled on PlannerBase or a PlannerStats is passed as stats to an
+    optimizer. Without one none of the instrumented code paths are taken: the cost functions are
+    not wrapped and the optimizers only test for stats once per phase.
+
+    PlannerBase times the cost functions and what they spend in linear_interpolation and
+    cost_func/cost_func2, the optimizers time their phases and record an IterationStats per iteration.
+    """
+
+    def __init__(self) -> None:
+        self.calls = dict()
+        self.times = dict()
+        self.iterations = list()
+
+    def count(self, name, number=1) -> None:
+        self.calls[name] = self.calls.get(name, 0) + number
+
+    def add_time(self, name, start) -> float:
+        """
+        Adds the time since start, a time.perf_counter() value, to name
+
+        Returns:
+            float: the current time.perf_counter(), the start of a following phase
+        """
+        now = time.perf_counter()
+        self.times[name] = self.times.get(name, 0.) + now - start
+        return now
+
+    def timed(self, name, function):
+        """
+        Returns function counting its calls and accumulating its time under name
+        """
+        def timed_function(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.add_time(name, start)
+                self.calls[name] = self.calls.get(name, 0) + 1
+        return timed_function
+
+    def record_iteration(self, iteration, best_value, positions) -> None:
+        self.iterations.append(IterationStats(iteration, float(best_value), get_diversity(positions)))
+
+    def as_dict(self) -> dict:
+        """
+        Returns the stats as a JSON serializable dict
+        """
+        return {
+            'calls': dict(self.calls),
+            'times': dict(self.times),
+            'iterations': [iteration._asdict() for iteration in self.iterations],
+        }
+
+    def __repr__(self) -> str:
+        return 'PlannerStats(calls=%r, times=%r, iterations=%d)' % (self.calls, self.times, len(self.iterations))
@@ -0,0 +1,143 @@
+from abc import ABC, abstractmethod
+
+from .stats import get_diversity
+
+
+class SolveProgress:
+    """
+    State of an optimizer after an iteration, as seen by the stopping criteria.
+    The positions of the population are only gathered if a criterion asks for them.
+    """
+
+    def __init__(self, iteration, best_value, evaluations, elapsed_time, get_positions) -> None:
+        self.iteration = iteration
+        self.best_value = best_value
+        self.evaluations = evaluations
+        self.elapsed_time = elapsed_time
+        self.__get_positions = get_positions
+        self.__diversity = None
+
+    @property
+    def diversity(self) -> float:
+        """
+        Mean distance of the population to its centroid
+        """
+        if self.__diversity is None:
+            self.__diversity = get_diversity(self.__get_positions())
+        return self.__diversity
+
+
+class StoppingCriterion(ABC):
+    """
+    Condition to end an optimizer run before its iteration_number, checked after every iteration.
+
+    Pass a list of criteria as stopping_criteria to PSOProblem, GWOProblem or ABCProblem, the run
+    stops at the first one met and its repr is the problem's stop_reason. A criterion is reset when
+    a problem is created, so one instance can be shared by the queries of a planner.
+    """
+
+    def reset(self) -> None:
+        """
+        Forget the progress of an earlier run
+        """
+
+    @abstractmethod
+    def should_stop(self, progress: SolveProgress) -> bool:
+        pass
+
+
+class NoImprovement(StoppingCriterion):
+    """
+    Stops once the best value did not improve by more than tolerance for patience iterations
+    """
+
+    def __init__(self, patience, tolerance=0.) -> None:
+        self.patience = patience
+        self.tolerance = tolerance
+        self.reset()
+
+    def reset(self) -> None:
+        self.__best_value = None
+        self.__since = 0
+
+    def should_stop(self, progress: SolveProgress) -> bool:
+        if self.__best_value is None or progress.best_value < self.__best_value - self.tolerance:
+            self.__best_value = progress.best_value
+            self.__since = progress.iteration
+            return False
+        return progress.iteration - self.__since >= self.patience
+
+    def __repr__(self) -> str:
+        return 'NoImprovement(patience=%r, tolerance=%r)' % (self.patience, self.tolerance)
+
+
+class RelativeImprovement(StoppingCriterion):
+    """
+    Stops once the best value improved by less than threshold, relative to its value,
+    over the last window iterations
+    """
+
+    def __init__(self, threshold, window=5) -> None:
+        self.threshold = threshold
+        self.window = window
+        self.reset()
+
+    def reset(self) -> None:
+        self.__best_values = list()
+
+    def should_stop(self, progress: SolveProgress) -> bool:
+        self.__best_values.append(progress.best_value)
+        if len(self.__best_values) <= self.window:
+            return False
+        del self.__best_values[:-self.window - 1]
+        old_value = self.__best_values[0]
+        improvement = old_value - progress.best_value
+        return improvement <= self.threshold * abs(old_value)
+
+    def __repr__(self) -> str:
+        return 'RelativeImprovement(threshold=%r, window=%r)' % (self.threshold, self.window)
+
+
+class MinDiversity(StoppingCriterion):
+    """
+    Stops once the population collapsed: its mean distance to its centroid is below epsilon
+    """
+
+    def __init__(self, epsilon) -> None:
+        self.epsilon = epsilon
+
+    def should_stop(self, progress: SolveProgress) -> bool:
+        return progress.diversity < self.epsilon
+
+    def __repr__(self) -> str:
+        return 'MinDiversity(epsilon=%r)' % (self.epsilon,)
+
+
+class MaxEvaluations(StoppingCriterion):
+    """
+    Stops once the cost function scored at least evaluations particles, initialization included
+    """
+
+    def __init__(self, evaluations) -> None:
+        self.evaluations = evaluations
+
+    def should_stop(self, progress: SolveProgress) -> bool:
+        return progress.evaluations >= self.evaluations
+
+    def __repr__(self) -> str:
+        return 'MaxEvaluations(evaluations=%r)' % (self.evaluations,)
+
+
+class TimeBudget(StoppingCriterion):
+    """
+    Stops once seconds passed since the problem was created, initialization included
+    """
+
+    def __init__(self, seconds) -> None:
+        self.seconds = seconds
+
+    def should_stop(self, progress: SolveProgress) -> bool:
+        return progress.elapsed_time >= self.seconds
+
+    def __repr__(self) -> str:
+        return 'TimeBudget(seconds=%r)' % (self.seconds,)
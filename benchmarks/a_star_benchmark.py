@@ -0,0 +1,203 @@
+"""
+Benchmark of the heap based AStarPlanner against the dict-scan A* used in the
+planner comparison notebooks, on the maps in map_params.
+
+Run from the repository root (needs the map_generator submodule):
+
+    python -m benchmarks.a_star_benchmark --scale 0.25
+"""
+import argparse
+import glob
+import json
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+from map_generator import MapGenerator
+from Planners.a_star.a_star import AStarPlanner
+
+
+class DictAStarPlanner:
+    """
+    The A* of the planner comparison notebooks: the open set is a dict and the
+    next node is picked with a min() scan over it.
+    """
+    class Node:
+        def __init__(self, x_pos, y_pos, goal_node):
+            self.x_pos, self.y_pos = x_pos, y_pos
+            if goal_node is None:
+                goal_node = self
+            self.goal_node = goal_node
+            self.parent = None
+            self.distance = 0
+            goal_distance = (x_pos - goal_node.x_pos) ** 2
+            goal_distance += (y_pos - goal_node.y_pos) ** 2
+            goal_distance = goal_distance ** 0.5
+            self.goal_distance = goal_distance
+            self.cost = goal_distance
+
+        def set_parent(self, parent):
+            self.parent = parent
+            if self.x_pos == parent.x_pos or self.y_pos == parent.y_pos:
+                step_length = 1
+            else:
+                step_length = 2 ** 0.5
+            self.distance = parent.distance + step_length
+            self.cost = self.distance + self.goal_distance
+
+        def is_goal(self):
+            return self.x_pos == self.goal_node.x_pos and self.y_pos == self.goal_node.y_pos
+
+    def __init__(self, curr_map):
+        self.map = curr_map
+        self.y_min, self.x_min = 0, 0
+        self.y_max, self.x_max = curr_map.shape
+        self.visited = np.zeros(curr_map.shape, dtype=bool)
+
+    def verifyNode(self, node):
+        if node.x_pos < self.x_min:
+            return False
+        if node.x_pos >= self.x_max:
+            return False
+        if node.y_pos < self.y_min:
+            return False
+        if node.y_pos >= self.y_max:
+            return False
+        if self.map[node.y_pos, node.x_pos] == 0:
+            return False
+        return True
+
+    def get_id(self, node):
+        return node.y_pos * self.x_max + node.x_pos
+
+    def get_neighbours(self, curr_node, goal_node):
+        neighbour_nodes = list()
+        for x_move in [-1, 0, 1]:
+            for y_move in [-1, 0, 1]:
+                if x_move == 0 and y_move == 0:
+                    continue
+                new_node = self.Node(curr_node.x_pos+x_move, curr_node.y_pos+y_move, goal_node)
+                new_node.set_parent(curr_node)
+                if self.verifyNode(new_node):
+                    neighbour_nodes.append(new_node)
+        return neighbour_nodes
+
+    def get_path(self, start, end):
+        goal_node = self.Node(end[0], end[1], None)
+        start_node = self.Node(start[0], start[1], goal_node)
+        goal_found = False
+
+        if not self.verifyNode(start_node) or not self.verifyNode(goal_node):
+            return np.array([])
+
+        curr_node = start_node
+        frontier = dict()
+        for node in self.get_neighbours(curr_node, goal_node):
+            node_id = self.get_id(node)
+            frontier[node_id] = node
+
+        while len(frontier):
+            curr_node_key = min(frontier, key=lambda node_id: frontier[node_id].cost)
+            curr_node = frontier[curr_node_key]
+
+            if curr_node.is_goal():
+                goal_node.set_parent(curr_node.parent)
+                goal_found = True
+                break
+
+            del frontier[curr_node_key]
+            self.visited[curr_node.y_pos, curr_node.x_pos] = True
+
+            for node in self.get_neighbours(curr_node, goal_node):
+                node_id = self.get_id(node)
+                if self.visited[node.y_pos, node.x_pos]:
+                    continue
+                if node_id not in frontier:
+                    frontier[node_id] = node
+                else:
+                    if frontier[node_id].cost > node.cost:
+                        frontier[node_id] = node
+
+        if not goal_found:
+            return np.array([])
+
+        path_points = list()
+        curr_node = goal_node
+        while curr_node.x_pos != start_node.x_pos or curr_node.y_pos != start_node.y_pos:
+            path_points.append([curr_node.x_pos, curr_node.y_pos])
+            curr_node = curr_node.parent
+        path_points.append([start_node.x_pos, start_node.y_pos])  # add start point
+
+        return np.array(path_points[::-1])
+
+
+def get_path_length(path):
+    steps = np.abs(np.diff(path, axis=0))
+    diagonal = np.sum(np.all(steps == 1, axis=1))
+    return (len(steps) - diagonal) + diagonal * 2 ** 0.5
+
+
+def find_free_point(curr_map, point):
+    """
+    Returns the free cell closest to the given [x, y] point
+    """
+    free_y, free_x = np.nonzero(curr_map)
+    closest = np.argmin((free_x - point[0]) ** 2 + (free_y - point[1]) ** 2)
+    return np.array([free_x[closest], free_y[closest]])
+
+
+def load_map(file_name, scale):
+    curr_map = MapGenerator(file_name).map.get_map()
+    if scale != 1:
+        size = (round(curr_map.shape[1] * scale), round(curr_map.shape[0] * scale))
+        curr_map = np.array(Image.fromarray(curr_map).resize(size, Image.Resampling.NEAREST))
+    return curr_map
+
+
+def run_benchmark(map_files, scale, skip_dict_above):
+    results = list()
+    for file_name in map_files:
+        curr_map = load_map(file_name, scale)
+        height, width = curr_map.shape
+        start = find_free_point(curr_map, (0.05 * width, 0.05 * height))
+        end = find_free_point(curr_map, (0.95 * width, 0.95 * height))
+
+        row = {'map_file': os.path.basename(file_name), 'shape': [height, width]}
+        planners = [('heap', AStarPlanner)]
+        if height * width <= skip_dict_above:
+            planners.append(('dict', DictAStarPlanner))
+        for name, planner_class in planners:
+            planner = planner_class(curr_map)
+            start_time = time.perf_counter()
+            path = planner.get_path(start, end)
+            row[name + '_time'] = time.perf_counter() - start_time
+            row[name + '_length'] = float(get_path_length(path)) if len(path) else None
+        if 'dict_time' in row:
+            row['speedup'] = row['dict_time'] / row['heap_time']
+        results.append(row)
+        print(json.dumps(row))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--maps', default=os.path.join('map_params', '*_params.yaml'),
+                        help='glob of the map parameter files')
+    parser.add_argument('--scale', type=float, default=0.25,
+                        help='nearest neighbour scale applied to every map')
+    parser.add_argument('--skip-dict-above', type=int, default=500 * 500,
+                        help='only run the dict-scan A* on maps with at most this many cells')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    map_files = sorted(glob.glob(args.maps))
+    results = run_benchmark(map_files, args.scale, args.skip_dict_above)
+    if args.output:
+        with open(args.output, 'w') as out_file:
+            json.dump(results, out_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Allocation benchmark of the optimizer loops: memory allocated per iteration by PSOProblem,
+GWOProblem and ABCProblem on maps of growing size.
+
+The cost function is an object holding the map as data, which copying an agent with
+copy.deepcopy would duplicate along with it, unlike a closure. It scores a particle in constant
+time, so what is measured is the optimizer itself: an optimizer that copies agents, or anything
+else referencing the cost function, allocates in proportion to the map size and fails --check.
+tracemalloc reports, for every iteration, the peak of the traced memory above its level at the
+start of the iteration.
+
+    python -m benchmarks.allocation_benchmark --sizes 100 400 1600 --check
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from Planners.abc.abc_problem import ABCProblem
+from Planners.gwo.gwo_problem import GWOProblem
+from Planners.pso.pso_problem import PSOProblem
+
+OPTIMIZERS = {
+    'pso': (PSOProblem, {'particles': 50}),
+    'pso_vectorized': (PSOProblem, {'particles': 50, 'vectorized': True}),
+    'gwo': (GWOProblem, {'wolves': 50}),
+    'gwo_vectorized': (GWOProblem, {'wolves': 50, 'vectorized': True}),
+    'abc': (ABCProblem, {'bees': 25}),
+    'abc_vectorized': (ABCProblem, {'bees': 25, 'vectorized': True}),
+}
+
+
+class ConstantTimeCostFunction:
+    """
+    Cost function holding the map as instance data
+    """
+
+    def __init__(self, curr_map):
+        self.map = curr_map
+
+    def __call__(self, particles, bound=None):
+        return float(np.sum((particles - 0.5) ** 2)) + float(self.map[0, 0] == 0)
+
+
+def measure_optimizer(optimizer, optimizer_params, curr_map, iterations, points, seed=0):
+    """
+    Returns the median and maximum of the per iteration allocation peaks in bytes
+    and the mean time per iteration of one optimizer run
+    """
+    peaks = list()
+
+    def iteration_callback(iteration, best_position):
+        current, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - iteration_callback.start)
+        tracemalloc.reset_peak()
+        iteration_callback.start = current
+
+    opt = optimizer(**optimizer_params, iteration_number=iterations, points=points, seed=seed,
+                    function=ConstantTimeCostFunction(curr_map), iteration_callback=iteration_callback)
+    tracemalloc.start()
+    iteration_callback.start = tracemalloc.get_traced_memory()[0]
+    start_time = time.perf_counter()
+    opt.solve()
+    elapsed_time = time.perf_counter() - start_time
+    tracemalloc.stop()
+    # the first iteration also pays for lazily created objects
+    peaks = np.array(peaks[1:])
+    return float(np.median(peaks)), int(peaks.max()), elapsed_time / iterations
+
+
+def run_benchmark(sizes, iterations, points, optimizers):
+    results = list()
+    for size in sizes:
+        curr_map = np.full((size, size), 255, dtype=np.uint8)
+        for name in optimizers:
+            optimizer, optimizer_params = OPTIMIZERS[name]
+            median_peak, max_peak, iteration_time = measure_optimizer(
+                optimizer, optimizer_params, curr_map, iterations, points)
+            row = {
+                'optimizer': name,
+                'map_size': size,
+                'median_iteration_peak_bytes': median_peak,
+                'max_iteration_peak_bytes': max_peak,
+                'iteration_time': iteration_time
+            }
+            results.append(row)
+            print(json.dumps(row))
+    return results
+
+
+def check_results(results, tolerance):
+    """
+    Returns the optimizers whose median or maximum allocation peak per iteration grows with the
+    map size by more than the tolerance factor. The maximum catches copies made only in the
+    iterations that find a new best.
+    """
+    failed = list()
+    for name in sorted({row['optimizer'] for row in results}):
+        for field in ('median_iteration_peak_bytes', 'max_iteration_peak_bytes'):
+            peaks = [row[field] for row in results if row['optimizer'] == name]
+            if max(peaks) > tolerance * max(min(peaks), 1):
+                failed.append(name)
+                break
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 400, 1600],
+                        help='side lengths of the square maps')
+    parser.add_argument('--iterations', type=int, default=30, help='optimizer iterations')
+    parser.add_argument('--points', type=int, default=5, help='points per particle')
+    parser.add_argument('--optimizers', nargs='+', default=list(OPTIMIZERS), choices=list(OPTIMIZERS))
+    parser.add_argument('--check', action='store_true',
+                        help='exit with an error if the allocations per iteration grow with the map size')
+    parser.add_argument('--tolerance', type=float, default=1.5,
+                        help='allowed ratio between the largest and the smallest median peak of an optimizer')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.sizes, args.iterations, args.points, args.optimizers)
+    if args.output:
+        with open(args.output, 'w') as out_file:
+            json.dump(results, out_file, indent=2)
+    if args.check:
+        failed = check_results(results, args.tolerance)
+        if failed:
+            print('Allocations per iteration grow with the map size for: %s' % ', '.join(failed))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
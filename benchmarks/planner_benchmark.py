@@ -0,0 +1,291 @@
+"""
+Benchmark suite of the planners on the maps in map_params: A*, Q-learning, PSO, GWO and ABC
+at several map scales, with the start and goal fixtures of the planner comparison notebooks.
+
+Every map, scale and planner is run in a fresh worker process, so its peak RSS is its own, with a
+deterministic seed per run. A result row holds the median and p95 latency, the cost function calls
+per second of the optimizers, the peak RSS and the path quality of get_path_cost.
+
+Run from the repository root (needs the map_generator submodule):
+
+    python -m benchmarks.planner_benchmark --scales 0.25 0.5 --output results/benchmark.json
+    python -m benchmarks.planner_benchmark --compare results/baseline.json results/benchmark.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+from experiments.runner import get_run_seed
+from Planners.a_star.a_star import AStarPlanner
+from Planners.abc.abc_problem import ABCProblem
+from Planners.gwo.gwo_problem import GWOProblem
+from Planners.helper import get_path_cost
+from Planners.pso.pso_problem import PSOProblem
+from Planners.util.map_context import MapContext
+from qlearning.qlearning import QLearningPathPlanner
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# start and end on the full size maps, points of the optimizers, as in the planner compare notebooks
+FIXTURES = {
+    'custom_map_2': {'file_name': 'custom_map_2_params.yaml', 'start': [100, 400], 'end': [400, 100], 'points': 1},
+    'custom_map_4': {'file_name': 'custom_map_4_params.yaml', 'start': [50, 250], 'end': [250, 250], 'points': 2},
+    'custom_map_3': {'file_name': 'custom_map_3_params.yaml', 'start': [50, 450], 'end': [300, 100], 'points': 2},
+    'custom_map_1': {'file_name': 'custom_map_1_params.yaml', 'start': [600, 800], 'end': [1700, 500], 'points': 3},
+    'map_012': {'file_name': 'map_012_params.yaml', 'start': [250, 1750], 'end': [1250, 200], 'points': 4},
+}
+
+PLANNERS = {
+    'a_star': {'planner': AStarPlanner},
+    'qlearning': {'planner': QLearningPathPlanner},
+    'abc': {
+        'optimizer': ABCProblem,
+        'optimizer_params': {'iteration_number': 10, 'bees': 10, 'high_step_prob': 0.3},
+        'cost_func_wt': (2, 1, 2)
+    },
+    'gwo': {
+        'optimizer': GWOProblem,
+        'optimizer_params': {'iteration_number': 10, 'wolves': 20},
+        'cost_func_wt': (2, 1, 2)
+    },
+    'pso': {
+        'optimizer': PSOProblem,
+        'optimizer_params': {'iteration_number': 10, 'particles': 20, 'weight': 0.5, 'c_1': 1.5, 'c_2': 1.5},
+        'cost_func_wt': (2, 1, 2)
+    },
+}
+
+# result fields compared by --compare, with True if larger values are better
+COMPARED_FIELDS = {
+    'median_latency': False,
+    'p95_latency': False,
+    'cost_calls_per_second': True,
+    'peak_rss_bytes': False,
+    'mean_length': False,
+    'mean_violations': False,
+    'reached_goal': True,
+}
+
+
+def get_peak_rss():
+    """
+    Returns the peak resident set size of this process in bytes, or None where it is not available
+    """
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak_rss if sys.platform == 'darwin' else peak_rss * 1024
+
+
+def get_counting_optimizer(optimizer, counter):
+    """
+    Returns a factory of optimizer that counts the particles scored by its cost functions in counter[0]
+    """
+    def create(**kwargs):
+        function = kwargs['function']
+
+        def counted_function(particles, bound=None):
+            counter[0] += 1
+            return function(particles, bound=bound)
+        kwargs['function'] = counted_function
+
+        batch_function = kwargs.get('batch_function', None)
+        if batch_function is not None:
+            def counted_batch_function(particles, bound=None):
+                counter[0] += particles.shape[0]
+                return batch_function(particles, bound=bound)
+            kwargs['batch_function'] = counted_batch_function
+        return optimizer(**kwargs)
+    return create
+
+
+def run_case(case):
+    """
+    Runs all runs of a planner on a map at a scale and returns the result row
+    """
+    from benchmarks.a_star_benchmark import find_free_point, load_map
+    details = FIXTURES[case['map_name']]
+    scale = case['scale']
+    curr_map = load_map(os.path.join(case['map_dir'], details['file_name']), scale)
+    start = find_free_point(curr_map, np.array(details['start']) * scale)
+    end = find_free_point(curr_map, np.array(details['end']) * scale)
+    planner_params = PLANNERS[case['planner_name']]
+    context = MapContext(curr_map)
+
+    latencies, lengths, violations, violation_costs = list(), list(), list(), list()
+    reached_goal = 0
+    cost_calls = [0]
+    for run in range(1, case['runs'] + 1):
+        seed = get_run_seed(case['seed'], case['map_index'], case['planner_index'], run)
+        if 'optimizer' in planner_params:
+            optimizer_params = dict(planner_params['optimizer_params'], points=details['points'], seed=seed)
+            planner = context.get_planner(
+                optimizer=get_counting_optimizer(planner_params['optimizer'], cost_calls),
+                optimizer_params=optimizer_params,
+                cost_func_wt=planner_params['cost_func_wt'],
+                batch_cost=case['batch_cost']
+            )
+        elif planner_params['planner'] is QLearningPathPlanner:
+            np.random.seed(seed)
+            planner = QLearningPathPlanner(curr_map, start, end, episodes=case['episodes'])
+        else:
+            planner = planner_params['planner'](curr_map)
+
+        start_time = time.perf_counter()
+        if isinstance(planner, QLearningPathPlanner):
+            planner.train()
+            path = planner.get_greedy_path()
+        else:
+            path = planner.get_path(start, end)
+        latencies.append(time.perf_counter() - start_time)
+
+        path_length, path_violations, violation_cost = get_path_cost(curr_map, path)
+        if path_length is not None:
+            lengths.append(path_length)
+            violations.append(path_violations)
+            violation_costs.append(violation_cost)
+            reached_goal += int(np.array_equal(path[-1], end))
+
+    total_time = sum(latencies)
+    return {
+        'map_file': details['file_name'],
+        'map_name': case['map_name'],
+        'scale': scale,
+        'shape': list(curr_map.shape),
+        'start': start.tolist(),
+        'end': end.tolist(),
+        'planner_name': case['planner_name'],
+        'runs': case['runs'],
+        'median_latency': float(np.median(latencies)),
+        'p95_latency': float(np.percentile(latencies, 95)),
+        'cost_calls': cost_calls[0] if 'optimizer' in planner_params else None,
+        'cost_calls_per_second': cost_calls[0] / total_time if 'optimizer' in planner_params else None,
+        'peak_rss_bytes': get_peak_rss(),
+        'mean_length': float(np.mean(lengths)) if lengths else None,
+        'mean_violations': float(np.mean(violations)) if violations else None,
+        'mean_violation_cost': float(np.mean(violation_costs)) if violation_costs else None,
+        'reached_goal': reached_goal,
+    }
+
+
+def run_benchmark(map_names, scales, planner_names, runs, episodes, seed=0, batch_cost=False, map_dir='map_params'):
+    """
+    Runs every planner on every map and scale, each in its own worker process, and returns the result rows
+    """
+    cases = [
+        {
+            'map_name': map_name, 'map_index': map_index, 'planner_name': planner_name,
+            'planner_index': planner_index, 'scale': scale, 'runs': runs, 'episodes': episodes,
+            'seed': seed, 'batch_cost': batch_cost, 'map_dir': map_dir
+        }
+        for scale in scales
+        for map_index, map_name in enumerate(map_names)
+        for planner_index, planner_name in enumerate(planner_names)
+    ]
+    results = list()
+    # a fresh process per case, so the peak RSS of a row is not the one of an earlier case
+    with multiprocessing.get_context('spawn').Pool(processes=1, maxtasksperchild=1) as pool:
+        for row in pool.imap(run_case, cases):
+            results.append(row)
+            print(json.dumps(row))
+    return results
+
+
+def get_environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+    }
+
+
+def compare_results(baseline, current, tolerance):
+    """
+    Returns the regressions of current against baseline: a row per map, scale, planner and field
+    whose value got worse by more than the tolerance fraction or is missing now, e.g. mean_length
+    once a planner returns no path. A baseline row missing from current is a regression of its
+    field 'row'.
+    """
+    def key(row):
+        return row['map_name'], row['scale'], row['planner_name']
+
+    def regression(row, field, old_value, new_value):
+        return {
+            'map_name': row['map_name'], 'scale': row['scale'], 'planner_name': row['planner_name'],
+            'field': field, 'baseline': old_value, 'current': new_value
+        }
+
+    current_rows = {key(row): row for row in current['results']}
+    regressions = list()
+    for baseline_row in baseline['results']:
+        row = current_rows.get(key(baseline_row))
+        if row is None:
+            regressions.append(regression(baseline_row, 'row', 'present', 'missing'))
+            continue
+        for field, larger_is_better in COMPARED_FIELDS.items():
+            old_value, new_value = baseline_row.get(field), row.get(field)
+            if old_value is None:
+                continue
+            if new_value is None:
+                regressed = True
+            elif larger_is_better:
+                regressed = new_value < old_value * (1 - tolerance)
+            else:
+                regressed = new_value > old_value * (1 + tolerance)
+            if regressed:
+                regressions.append(regression(row, field, old_value, new_value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--maps', nargs='+', default=list(FIXTURES), choices=list(FIXTURES))
+    parser.add_argument('--scales', type=float, nargs='+', default=[0.25, 0.5],
+                        help='nearest neighbour scales applied to every map')
+    parser.add_argument('--planners', nargs='+', default=list(PLANNERS), choices=list(PLANNERS))
+    parser.add_argument('--runs', type=int, default=5, help='runs per map, scale and planner')
+    parser.add_argument('--episodes', type=int, default=300, help='Q-learning episodes')
+    parser.add_argument('--seed', type=int, default=0, help='base seed of the run seeds')
+    parser.add_argument('--batch-cost', action='store_true', help='score optimizer populations with batch cost functions')
+    parser.add_argument('--map-dir', default='map_params', help='directory of the map parameter files')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help='compare two result files instead of running, exit with an error on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='relative change of a field that is not reported as a regression')
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as baseline_file, open(args.compare[1]) as current_file:
+            regressions = compare_results(json.load(baseline_file), json.load(current_file), args.tolerance)
+        for regression in regressions:
+            print(json.dumps(regression))
+        if regressions:
+            print('%d regressions above a tolerance of %g' % (len(regressions), args.tolerance))
+            sys.exit(1)
+        return
+
+    config = {key: value for key, value in vars(args).items() if key not in ('output', 'compare', 'tolerance')}
+    results = run_benchmark(args.maps, args.scales, args.planners, args.runs, args.episodes, args.seed,
+                            args.batch_cost, args.map_dir)
+    if args.output:
+        output_dir = os.path.dirname(args.output)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        with open(args.output, 'w') as out_file:
+            json.dump({'environment': get_environment(), 'config': config, 'results': results}, out_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
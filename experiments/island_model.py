@@ -0,0 +1,195 @@
+"""
+Island model runner: several independent populations of one optimizer in worker processes.
+
+Every island is a PlannerBase query with its own default_rng seed, spawned from one
+SeedSequence. The islands form a ring, every migration_interval iterations each sends
+its best migrants individuals to the next island and takes in the ones of the previous
+island in place of its worst. The best solution of all islands is returned.
+
+    planner = IslandPlanner(map=curr_map, optimizer=PSOProblem, optimizer_params=params,
+                            cost_func_wt=0.5, islands=8, migration_interval=10, migrants=2, seed=0)
+    path = planner.get_path(start, end)
+
+The map is placed in a MapStore once and attached by every island.
+"""
+import logging
+import multiprocessing
+import os
+import queue
+
+import numpy as np
+
+from Planners.util.map_store import MapStore, attach_map
+from Planners.util.planner_base import PlannerBase, particle_to_path
+
+LOGGER = logging.getLogger(__name__)
+
+# Seconds between checks for islands that died without a result
+RESULT_POLL_INTERVAL = 0.5
+
+
+class RingMigration:
+    """
+    Migration channel of an island: sends to the next island of the ring, receives from the previous one.
+
+    The exchange is synchronous, an island waits for the migrants of its neighbour of the same
+    iteration. An island that ended its run closes its channel, its neighbour then goes on without
+    immigrants.
+    """
+
+    def __init__(self, inbox, outbox, interval, migrants) -> None:
+        self.inbox = inbox
+        self.outbox = outbox
+        self.interval = interval
+        self.migrants = migrants
+        self.__upstream_closed = False
+
+    def exchange(self, iteration, positions, values):
+        """
+        Sends the emigrants of the island and returns the immigrants, no immigrants once the previous island ended
+        """
+        self.outbox.put((iteration, positions, values))
+        if not self.__upstream_closed:
+            message = self.inbox.get()
+            if message is not None:
+                return message[1], message[2]
+            self.__upstream_closed = True
+        return np.empty((0, positions.shape[1])), np.empty(0)
+
+    def close(self) -> None:
+        self.outbox.put(None)
+
+
+def _run_island(task, inbox, outbox, results):
+    """
+    Solves the query of one island in a worker process and puts (island, solution or error) on results
+    """
+    channel = RingMigration(inbox, outbox, task['migration_interval'], task['migrants'])
+    try:
+        planner_params = dict(task['planner_params'], map=attach_map(task['map_handle']))
+        planner_params['optimizer_params'] = dict(planner_params['optimizer_params'],
+                                                  seed=task['seed'], migration=channel)
+        planner = PlannerBase(**planner_params)
+        result = planner.solve(task['start'], task['end'])
+    except Exception as error:  # pylint: disable=broad-except
+        LOGGER.exception('Island %d failed', task['island'])
+        result = error
+    finally:
+        channel.close()
+    results.put((task['island'], result))
+
+
+class IslandPlanner:
+    def __init__(self, **kwargs):
+        """
+        Takes the arguments of PlannerBase and
+
+        islands (int): populations run in parallel, one per core by default
+        migration_interval (int): iterations between migrations
+        migrants (int): individuals every island sends per migration
+        seed: seed of the SeedSequence the island seeds are spawned from
+        mp_context (str): multiprocessing start method, the platform default if None
+        """
+        self.map = kwargs['map']
+        self.islands = kwargs.get('islands', None) or os.cpu_count()
+        self.migration_interval = kwargs.get('migration_interval', 10)
+        self.migrants = kwargs.get('migrants', 1)
+        self.seed = kwargs.get('seed', None)
+        self.mp_context = kwargs.get('mp_context', None)
+        excluded = {'map', 'islands', 'migration_interval', 'migrants', 'seed', 'mp_context', 'com_index'}
+        self.planner_params = {key: value for key, value in kwargs.items() if key not in excluded}
+        # Callbacks can't be sent to the workers
+        self.planner_params['optimizer_params'] = {
+            key: value for key, value in kwargs['optimizer_params'].items() if key != 'iteration_callback'
+        }
+        # Solutions of the islands of the last query, by island
+        self.island_results = list()
+
+    def solve(self, start, end):
+        """
+        Runs the islands for a query and returns the best solution found by any of them
+        """
+        context = multiprocessing.get_context(self.mp_context)
+        seeds = np.random.SeedSequence(self.seed).spawn(self.islands)
+        # queue i carries the migrants from island i to island i+1
+        ring = [context.Queue() for _ in range(self.islands)]
+        results = context.Queue()
+        map_store = MapStore()
+        map_handle = map_store.put('map', self.map)
+        workers = list()
+        try:
+            for island in range(self.islands):
+                task = {
+                    'island': island,
+                    'map_handle': map_handle,
+                    'planner_params': self.planner_params,
+                    'start': start,
+                    'end': end,
+                    'seed': seeds[island],
+                    'migration_interval': self.migration_interval,
+                    'migrants': self.migrants
+                }
+                worker = context.Process(target=_run_island, args=(task, ring[island - 1], ring[island], results),
+                                         daemon=True)
+                worker.start()
+                workers.append(worker)
+
+            island_results = self.__collect(workers, results)
+            self.__join(workers, ring)
+        finally:
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+            map_store.close()
+
+        self.island_results = island_results
+        for island, result in enumerate(island_results):
+            if isinstance(result, Exception):
+                raise RuntimeError('Island %d failed' % island) from result
+        best_sol = min(island_results, key=lambda solution: solution.value)
+        LOGGER.info('Best solution="%s" of %d islands', best_sol.value, self.islands)
+        return best_sol
+
+    @staticmethod
+    def __collect(workers, results):
+        """
+        Returns the result of every island, raises if an island died without posting one
+        """
+        island_results = [None] * len(workers)
+        pending = set(range(len(workers)))
+        while pending:
+            try:
+                island, result = results.get(timeout=RESULT_POLL_INTERVAL)
+            except queue.Empty:
+                # a worker that ended flushed its result before exiting, unless it was killed
+                dead = [island for island in sorted(pending) if workers[island].exitcode is not None]
+                if dead:
+                    try:
+                        island, result = results.get(timeout=RESULT_POLL_INTERVAL)
+                    except queue.Empty:
+                        LOGGER.error('Island %d exited with code %s without a result',
+                                     dead[0], workers[dead[0]].exitcode)
+                        raise RuntimeError('Island %d failed' % dead[0]) from None
+                else:
+                    continue
+            island_results[island] = result
+            pending.discard(island)
+        return island_results
+
+    @staticmethod
+    def __join(workers, ring):
+        # Migrants sent to islands that already ended are never received,
+        # drain them so the workers can flush their queues and exit
+        while any(worker.is_alive() for worker in workers):
+            for inbox in ring:
+                try:
+                    while True:
+                        inbox.get_nowait()
+                except queue.Empty:
+                    pass
+            for worker in workers:
+                worker.join(timeout=0.01)
+
+    def get_path(self, start, end):
+        best_sol = self.solve(start, end)
+        return particle_to_path(self.map, start, end, best_sol.position)
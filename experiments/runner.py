@@ -0,0 +1,198 @@
+"""
+Process-pool runner for the planner comparison sweep of the notebooks.
+
+The maps x planners x runs of a sweep are independent, so they are fanned out over a
+ProcessPoolExecutor. Every map is placed in a MapStore once and workers attach to it
+instead of receiving a pickled copy per run, every run gets a deterministic seed and the
+result rows are appended to a CSV file as soon as they complete.
+
+    python -m experiments.runner sweep_config.py --output results/sweep.csv --workers 32
+
+The config file is a Python file defining planner_params, map_details and total_runs
+in the format of the planner compare notebooks.
+"""
+import argparse
+import csv
+import logging
+import os
+import runpy
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from Planners.helper import get_path_cost
+from Planners.util.map_context import MapContext
+from Planners.util.map_store import MapStore, attach_map
+from Planners.util.planner_base import PlannerBase
+
+LOGGER = logging.getLogger(__name__)
+
+RESULT_FIELDS = ['map_file', 'planner_name', 'run', 'seed', 'time_taken', 'distance', 'violation', 'violation_cost']
+
+
+def load_map(file_name, map_dir='map_params'):
+    from map_generator import MapGenerator
+    return MapGenerator(os.path.join(map_dir, file_name)).map.get_map()
+
+
+def get_run_seed(base_seed, *keys):
+    """
+    Returns a deterministic seed for the run identified by keys
+    """
+    return int(np.random.SeedSequence([base_seed, *keys]).generate_state(1)[0])
+
+
+def run_task(task):
+    """
+    Executes a single planner run in a worker and returns its result row
+    """
+    curr_map = attach_map(task['map_handle'])
+    planner_params = task['planner_params']
+    if 'optimizer' in planner_params:
+        opt_params = dict(planner_params['optimizer_params'], **task['query_params'], seed=task['seed'])
+        opt_params.pop('iteration_callback', None)
+        kwargs = dict(planner_params, map=curr_map, optimizer_params=opt_params)
+        if task['com_points'] is not None:
+            kwargs['com_points'], kwargs['com_weights'] = task['com_points']
+        planner = PlannerBase(**kwargs)
+    else:
+        planner = planner_params['planner'](curr_map)
+
+    start_time = time.time()
+    path = planner.get_path(task['start'], task['end'])
+    elapsed_time = time.time() - start_time
+    # all None, written as empty fields, if the planner found no path
+    path_length, violations, violation_cost = get_path_cost(curr_map, path)
+    return {
+        'map_file': task['map_file'],
+        'planner_name': task['planner_name'],
+        'run': task['run'],
+        'seed': task['seed'],
+        'time_taken': elapsed_time,
+        'distance': path_length,
+        'violation': violations,
+        'violation_cost': violation_cost
+    }
+
+
+def run_sweep(planner_params, map_details, total_runs, output_file, max_workers=None, base_seed=0,
+              map_dir='map_params', initial_particle=None, use_com=True, maps=None, map_store_dir=None):
+    """
+    Runs maps x planners x total_runs in a process pool, appending every result row to output_file
+
+    Args:
+        planner_params (dict): planner name to PlannerBase arguments (optimizer, optimizer_params,
+            cost_func_wt) or to {'planner': class} for planners constructed from the map alone
+        map_details (dict): map name to file_name, start, end and points
+        total_runs (int): runs per map and planner
+        output_file (str): CSV file the rows are streamed to
+        max_workers (int): worker processes, all cores if None
+        base_seed (int): seed every run seed is derived from
+        map_dir (str): directory of the map parameter files
+        initial_particle (dict): MapContext.initial_particle arguments plus move_range to seed the
+            optimizers from Q-learning as in the notebooks, or None to use the points of map_details
+        use_com (bool): use cost_func2 with the obstacle centre of mass term
+        maps (dict): preloaded maps by file name, loaded with map_generator otherwise
+        map_store_dir (str): directory to share the maps through as memory-mapped .npy files,
+            shared memory segments if None
+
+    Returns:
+        list: the result rows
+    """
+    output_dir = os.path.dirname(output_file)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    rows = list()
+    with MapStore(map_store_dir) as map_store:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = list()
+            for map_index, (map_name, curr_details) in enumerate(map_details.items()):
+                file_name = curr_details['file_name']
+                map_file_name = file_name.split('.')[0]
+                if map_file_name not in map_store:
+                    map_store.put(map_file_name, maps[file_name] if maps is not None else load_map(file_name, map_dir))
+                # the parent plans on the shared copy too
+                curr_map = map_store.get(map_file_name)
+                map_handle = map_store.handle(map_file_name)
+                start = np.array(curr_details['start']).astype(np.int32)
+                end = np.array(curr_details['end']).astype(np.int32)
+                context = MapContext(curr_map)
+
+                if initial_particle is not None:
+                    particle_params = dict(initial_particle)
+                    move_range = particle_params.pop('move_range', 0.01)
+                    np.random.seed(get_run_seed(base_seed, map_index))
+                    core_points, crude_particle = context.initial_particle(start, end, **particle_params)
+                    query_params = {
+                        'points': core_points.shape[0],
+                        'initial_particle': crude_particle,
+                        'move_range': move_range
+                    }
+                else:
+                    query_params = {'points': curr_details['points']}
+
+                com_points = context.com_points() if use_com else None
+
+                for planner_index, (planner_name, curr_params) in enumerate(planner_params.items()):
+                    if 'optimizer' not in curr_params and 'planner' not in curr_params:
+                        LOGGER.warning('Skipping %s, it has neither an optimizer nor a planner', planner_name)
+                        continue
+                    curr_params = {key: value for key, value in curr_params.items() if key != 'map'}
+                    for run in range(1, total_runs + 1):
+                        futures.append(executor.submit(run_task, {
+                            'map_handle': map_handle,
+                            'map_file': map_file_name,
+                            'planner_name': planner_name,
+                            'planner_params': curr_params,
+                            'query_params': query_params,
+                            'com_points': com_points,
+                            'start': start,
+                            'end': end,
+                            'run': run,
+                            'seed': get_run_seed(base_seed, map_index, planner_index, run)
+                        }))
+
+            with open(output_file, 'w', newline='') as out_file:
+                writer = csv.DictWriter(out_file, fieldnames=RESULT_FIELDS)
+                writer.writeheader()
+                for future in as_completed(futures):
+                    row = future.result()
+                    writer.writerow(row)
+                    out_file.flush()
+                    rows.append(row)
+                    LOGGER.info('%s-%s-%d done in %.2fs', row['map_file'], row['planner_name'], row['run'],
+                                row['time_taken'])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('config', help='Python file defining planner_params, map_details and total_runs')
+    parser.add_argument('--output', default=os.path.join('results', 'sweep.csv'), help='CSV file of the result rows')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes, all cores by default')
+    parser.add_argument('--seed', type=int, default=0, help='base seed of the run seeds')
+    parser.add_argument('--map-dir', default='map_params', help='directory of the map parameter files')
+    parser.add_argument('--map-store-dir', default=None,
+                        help='share the maps as memory-mapped files in this directory instead of shared memory')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    config = runpy.run_path(args.config)
+    run_sweep(
+        config['planner_params'],
+        config['map_details'],
+        config.get('total_runs', 5),
+        args.output,
+        max_workers=args.workers,
+        base_seed=args.seed,
+        map_dir=args.map_dir,
+        initial_particle=config.get('initial_particle', None),
+        use_com=config.get('use_com', True),
+        map_store_dir=args.map_store_dir
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+from typing import NamedTuple
+
+from PIL import Image
+import numpy as np
+
+from Planners.util.cache import LRUCache, get_map_fingerprint
+
+_PYRAMID_CACHE = LRUCache(maxsize=8)
+
+
+class PyramidLevel(NamedTuple):
+    """
+    Downscaled map of a pyramid level, the fraction of cells that differ from the full map
+    once it is scaled back up, and its resize factor
+    """
+    map: np.ndarray
+    loss: float
+    resize: float
+
+
+class MapPyramid:
+    """
+    Downscaled versions of a map at the resize factors resize_step, 2*resize_step, ... 1.
+
+    Levels are built on first use and kept, so every later request of a level is a lookup.
+    find_level measures the levels in order up to the first one meeting an allowed loss, as the
+    linear search of get_resized_map did, and keeps the index found per allowed loss.
+    """
+
+    def __init__(self, base_map, resize_step=0.1):
+        if not (1/resize_step).is_integer():
+            raise ValueError("resize_size %f if not proper" % resize_step)
+        self.base_map = np.array(base_map)
+        self.base_map.flags.writeable = False
+        self.resize_step = resize_step
+        # same accumulation as the linear search of get_resized_map, so the sizes match
+        self.scales = list()
+        curr_resize = 0
+        for _ in range(round(1/resize_step)):
+            curr_resize += resize_step
+            self.scales.append(curr_resize)
+        self.__base_img = Image.fromarray(self.base_map)
+        self.__levels = dict()
+        self.__found_levels = dict()
+
+    def __len__(self):
+        return len(self.scales)
+
+    def level(self, index):
+        """
+        Returns the PyramidLevel of resize factor scales[index]
+        """
+        index = range(len(self))[index]
+        if index not in self.__levels:
+            self.__levels[index] = self.__build_level(self.scales[index])
+        return self.__levels[index]
+
+    def find_level(self, allowed_loss):
+        """
+        Returns the index of the smallest resize factor whose loss is at most allowed_loss
+
+        The loss does not fall monotonically as the resize factor grows, a search skipping levels
+        can miss the first one meeting allowed_loss, so the levels are measured in order. The last
+        level is the full size map and is returned if no smaller one meets allowed_loss.
+        """
+        if allowed_loss not in self.__found_levels:
+            index = 0
+            while index < len(self) - 1 and self.level(index).loss > allowed_loss:
+                index += 1
+            self.__found_levels[allowed_loss] = index
+        return self.__found_levels[allowed_loss]
+
+    def resized_map(self, allowed_loss=0.1):
+        """
+        Returns the PyramidLevel of the smallest resize factor whose loss is at most allowed_loss
+        """
+        return self.level(self.find_level(allowed_loss))
+
+    def __build_level(self, curr_resize):
+        base_img = self.__base_img
+        curr_width = round(base_img.size[0] * curr_resize)
+        curr_height = round(base_img.size[1] * curr_resize)
+        curr_img = base_img.resize((curr_width, curr_height), Image.Resampling.NEAREST)
+        expanded_map = np.array(curr_img.resize(base_img.size, Image.Resampling.NEAREST))
+        mismatched_cells = np.count_nonzero(expanded_map != self.base_map)
+        curr_loss = mismatched_cells / self.base_map.size
+        curr_map = np.array(curr_img)
+        curr_map.flags.writeable = False
+        return PyramidLevel(curr_map, curr_loss, curr_resize)
+
+
+def get_map_pyramid(base_map, resize_step=0.1):
+    """
+    Returns the MapPyramid of a map, shared by every caller with the same map content and resize_step
+    """
+    return _PYRAMID_CACHE.get_or_create((get_map_fingerprint(base_map), resize_step),
+                                        lambda: MapPyramid(base_map, resize_step))
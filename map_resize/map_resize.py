@@ -1,26 +1,15 @@
-from PIL import Image
 import numpy as np
 
+from .map_pyramid import get_map_pyramid
+
 
 def get_resized_map(base_map, allowed_loss=0.1, resize_step=0.1):
-    base_map = base_map.copy()
-    if not (1/resize_step).is_integer():
-        raise ValueError("resize_size %f if not proper" % resize_step)
-    base_img = Image.fromarray(base_map)
-    curr_img = base_img.copy()
-    curr_resize = 0
-    curr_loss = 1
-    while curr_loss > allowed_loss:
-        curr_resize += resize_step
-        curr_width = round(base_img.size[0] * curr_resize)
-        curr_height = round(base_img.size[1] * curr_resize)
-        curr_img = base_img.resize((curr_width, curr_height), Image.Resampling.NEAREST)
-        expanded_image = curr_img.resize(base_img.size, Image.Resampling.NEAREST)
-        curr_map = np.array(expanded_image)
-        mismatched_cells = np.sum(curr_map != base_map)
-        total_cells = base_img.size[0] * base_img.size[1]
-        curr_loss = mismatched_cells / total_cells
-    return np.array(curr_img), curr_loss, curr_resize
+    """
+    Returns the smallest downscaled map, in steps of resize_step, whose loss is at most allowed_loss,
+    with its loss and resize factor. The levels come from the map pyramid cached per map, the map
+    is the read-only level itself.
+    """
+    return get_map_pyramid(base_map, resize_step).resized_map(allowed_loss)
 
 
 def get_core_points(path, min_point_separation):
@@ -0,0 +1,99 @@
+import glob
+import hashlib
+import os
+
+import numpy as np
+
+from Planners.util.cache import LRUCache, get_map_fingerprint
+
+
+class QTableStore:
+    """
+    Trained Q-tables by map, learning parameters and goal.
+
+    Q-learning on a fixed map learns mostly about its obstacles, so a q_table trained for one
+    goal is a good starting point for a nearby goal. The store keeps the trained q_tables in a
+    size-bounded cache and, if a directory is given, in .npz files that outlive the process.
+    """
+
+    def __init__(self, maxsize=64, directory=None):
+        self.directory = directory
+        self.__tables = LRUCache(maxsize=maxsize)
+        # goals with a stored q_table, by (map fingerprint, parameters)
+        self.__goals = dict()
+
+    def __len__(self):
+        return len(self.__tables)
+
+    def get(self, curr_map, goal_point, params=()):
+        """
+        Returns a copy of the q_table trained for the goal, or None if there is none
+        """
+        q_table = self.__load(self.__map_key(curr_map, params), self.__goal(goal_point))
+        return None if q_table is None else q_table.copy()
+
+    def nearest(self, curr_map, goal_point, params=()):
+        """
+        Returns the goal closest to goal_point with a q_table on the map and a copy of that q_table,
+        or (None, None) if no goal of the map has one
+        """
+        map_key = self.__map_key(curr_map, params)
+        goal_point = np.asarray(self.__goal(goal_point))
+        goals = sorted(self.__known_goals(map_key), key=lambda goal: np.sum((np.asarray(goal) - goal_point) ** 2))
+        for goal in goals:
+            q_table = self.__load(map_key, goal)
+            if q_table is not None:
+                return goal, q_table.copy()
+            self.__goals[map_key].discard(goal)
+        return None, None
+
+    def put(self, curr_map, goal_point, q_table, params=()):
+        """
+        Stores a copy of the q_table trained for the goal
+        """
+        map_key = self.__map_key(curr_map, params)
+        goal = self.__goal(goal_point)
+        q_table = np.array(q_table)
+        self.__tables.put((map_key, goal), q_table)
+        self.__goals.setdefault(map_key, set()).add(goal)
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            np.savez_compressed(self.__file_name(map_key, goal), q_table=q_table)
+
+    def clear(self):
+        self.__tables.clear()
+        self.__goals.clear()
+
+    @staticmethod
+    def __goal(goal_point):
+        return tuple(int(value) for value in goal_point)
+
+    @staticmethod
+    def __map_key(curr_map, params):
+        return get_map_fingerprint(curr_map), tuple(params)
+
+    def __file_prefix(self, map_key):
+        digest = hashlib.blake2b(repr(map_key).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.directory, 'qtable_%s' % digest)
+
+    def __file_name(self, map_key, goal):
+        return '%s_%d_%d.npz' % ((self.__file_prefix(map_key),) + goal)
+
+    def __known_goals(self, map_key):
+        goals = self.__goals.setdefault(map_key, set())
+        if self.directory is not None:
+            prefix = self.__file_prefix(map_key)
+            for file_name in glob.glob(glob.escape(prefix) + '_*_*.npz'):
+                goals.add(tuple(int(value) for value in file_name[len(prefix) + 1:-len('.npz')].split('_')))
+        return goals
+
+    def __load(self, map_key, goal):
+        q_table = self.__tables.get((map_key, goal))
+        if q_table is None and self.directory is not None:
+            file_name = self.__file_name(map_key, goal)
+            if os.path.exists(file_name):
+                with np.load(file_name) as data:
+                    q_table = data['q_table']
+                self.__tables.put((map_key, goal), q_table)
+                self.__goals.setdefault(map_key, set()).add(goal)
+        return q_table
@@ -1,5 +1,7 @@
 import numpy as np
 
+from .tables import get_cell_tables, get_transition_tables
+
 
 class QLearningPathPlanner:
     def __init__(self,
@@ -15,8 +17,14 @@ class QLearningPathPlanner:
                  goal_distance_reward=1,
                  obstacle_hit_reward=-100,
                  goal_reach_reward=100,
-                 bound_hit_reward=-50):
-        self.curr_map = curr_map.copy()
+                 bound_hit_reward=-50,
+                 table_cache_dir=None,
+                 q_table_store=None,
+                 patience=None,
+                 check_interval=10,
+                 episode_callback=None):
+        # only read, a read-only or shared view is kept as is
+        self.curr_map = curr_map
         self.start_point = np.array(start_point)
         self.curr_point = np.array(start_point)
         self.prev_point = np.array(start_point)
@@ -31,9 +39,20 @@ class QLearningPathPlanner:
         self.obstacle_hit_reward = obstacle_hit_reward
         self.goal_reach_reward = goal_reach_reward
         self.bound_hit_reward = bound_hit_reward
+        self.table_cache_dir = table_cache_dir
+        self.q_table_store = q_table_store
+        self.patience = patience
+        self.check_interval = check_interval
+        # Called as episode_callback(episodes_trained) during training, training stops if it returns True
+        self.episode_callback = episode_callback
         num_rows, num_columns = curr_map.shape
         self.q_table = np.zeros((num_rows + 2, num_columns + 2, 8))
         self.num_rows, self.num_columns = num_rows, num_columns
+        self.warm_start_goal = None
+        if q_table_store is not None:
+            self.warm_start_goal, q_table = q_table_store.nearest(curr_map, goal_point, self.__store_params())
+            if q_table is not None:
+                self.q_table = q_table
         self.actions = {
             0: np.array((-1, -1)),
             1: np.array((-1, 0)),
@@ -50,6 +69,7 @@ class QLearningPathPlanner:
         self.is_out_of_bounds = False
         self.first_goal_reached = None
         self.episode = 0
+        self.episodes_trained = 0
 
     def reset_state(self):
         self.curr_point = self.start_point
@@ -115,31 +135,263 @@ class QLearningPathPlanner:
         return False
 
     def train(self):
+        """
+        Trains the q_table with table lookups for the next states, rewards and terminal checks
+
+        With patience set, training stops early once the greedy path stayed the same for
+        patience episodes, checked every check_interval episodes. episode_callback is called
+        after every episode.
+
+        Returns:
+            int: number of episodes trained, also kept in episodes_trained
+        """
+        tables = self.get_transition_tables()
+        next_state, reward, terminal = tables
+        num_padded_columns = self.num_columns + 2
+        next_state = next_state.reshape(-1, 8)
+        reward = reward.reshape(-1, 8)
+        q_table = self.q_table.reshape(-1, 8)
+        start_state = (self.start_point[1] + 1) * num_padded_columns + self.start_point[0] + 1
+        self.__stable_path, self.__stable_since = None, 0
+
         for episode in range(self.episodes):
             self.episode = episode
             self.reset_state()
-            while not self.curr_is_terminal():
-                self.take_next_step()
-                curr_reward = self.get_reward()
-                prev_point = self.prev_point
-                curr_point = self.curr_point
-                prev_action = self.prev_action
-                prev_q_value = self.q_table[prev_point[1] + 1, prev_point[0] + 1, prev_action]
+            state = start_state
+            while not terminal[state]:
+                if np.random.random() < self.epsilon:
+                    action = np.argmax(q_table[state])
+                else:
+                    action = np.random.randint(8)
+                # tables are indexed by map cells, states by cells of the padded grid
+                cell = state - num_padded_columns - 2 * (state // num_padded_columns) + 1
+                new_state = next_state[cell, action]
+                prev_q_value = q_table[state, action]
                 temporal_difference = (
-                        curr_reward +
-                        (self.discount_factor * np.max(self.q_table[curr_point[1] + 1, curr_point[0] + 1])) -
+                        reward[cell, action] +
+                        (self.discount_factor * np.max(q_table[new_state])) -
                         prev_q_value
                 )
-                curr_q_value = prev_q_value + self.learning_rate * temporal_difference
-                self.q_table[prev_point[1] + 1, prev_point[0] + 1, prev_action] = curr_q_value
+                q_table[state, action] = prev_q_value + self.learning_rate * temporal_difference
+                state = new_state
+            self.curr_point = np.array(divmod(state, num_padded_columns)[::-1]) - 1
+            self.curr_is_terminal()
+            self.episodes_trained = episode + 1
+            if (self.patience is not None and self.episodes_trained % self.check_interval == 0 and
+                    self.__is_stable(tables, self.episodes_trained)):
+                break
+            if self.episode_callback is not None and self.episode_callback(self.episodes_trained):
+                break
+        return self.__finish_training()
 
     def get_path(self):
+        """
+        Returns the greedy path from the start point to the goal. The greedy policy is deterministic,
+        so if it comes back to a point it never reaches the goal and the path up to there is returned.
+        """
         self.reset_state()
         path = [self.start_point]
+        visited = {tuple(self.start_point)}
         epsilon = self.epsilon
         self.epsilon = 1
         while self.curr_point[0] != self.goal_point[0] or self.curr_point[1] != self.goal_point[1]:
             self.take_next_step()
+            if tuple(self.curr_point) in visited:
+                break
+            visited.add(tuple(self.curr_point))
             path.append(self.curr_point)
         self.epsilon = epsilon
         return np.array(path)
+
+    def get_greedy_path(self):
+        """
+        Returns the greedy path of the q_table from the start point, up to the goal, an obstacle,
+        the map bounds or a point it comes back to. Unlike get_path it neither changes the planner's
+        state nor draws random numbers, so it can be called during training.
+        """
+        num_padded_columns = self.num_columns + 2
+        states = self.__greedy_walk(self.get_transition_tables())
+        return np.array([divmod(state, num_padded_columns)[::-1] for state in states]) - 1
+
+    def get_cell_tables(self):
+        """
+        Returns the static per-cell tables of the padded q_table grid:
+        goal distance, reward for entering the cell (bound, obstacle or goal) and terminal flag
+        """
+        return get_cell_tables(self.curr_map, self.goal_point, self.obstacle_hit_reward,
+                               self.goal_reach_reward, self.bound_hit_reward)
+
+    def get_transition_tables(self):
+        """
+        Returns the next state, reward and terminal tables of the map and goal,
+        shared with every planner on the same map, goal and rewards
+        """
+        return get_transition_tables(
+            self.curr_map,
+            self.goal_point,
+            cache_dir=self.table_cache_dir,
+            straight_move_reward=self.straight_move_reward,
+            diagonal_move_reward=self.diagonal_move_reward,
+            goal_distance_reward=self.goal_distance_reward,
+            obstacle_hit_reward=self.obstacle_hit_reward,
+            goal_reach_reward=self.goal_reach_reward,
+            bound_hit_reward=self.bound_hit_reward
+        )
+
+    def train_batch(self, agents=16, precompute=True, seed=None):
+        """
+        Trains the shared q_table with several agents stepping at once
+
+        Every step advances all agents with array operations: epsilon-greedy actions, rewards,
+        terminal checks and temporal difference updates. An agent whose episode ended starts a new
+        one from the start point until self.episodes episodes were started.
+        Agents updating the same state and action in the same step keep only one of the updates.
+        With patience set, training stops early as in train, checked whenever another check_interval
+        episodes were started. episode_callback is called after every step in which episodes ended.
+
+        Args:
+            agents (int): number of agents stepping at once
+            precompute (bool): look the rewards and terminal flags up in the transition tables
+                instead of computing them every step
+            seed: seed of the generator used for the exploration
+
+        Returns:
+            int: number of episodes started, also kept in episodes_trained
+        """
+        random = np.random.default_rng(seed)
+        q_table = self.q_table
+        moves = np.array([self.actions[action] for action in range(8)])
+        move_distance = np.sqrt(moves[:, 0] ** 2 + moves[:, 1] ** 2)
+        move_reward = np.where(move_distance == 1, self.straight_move_reward, self.diagonal_move_reward)
+
+        tables = self.get_transition_tables() if precompute or self.patience is not None else None
+        terminal = tables.terminal.reshape(self.num_rows + 2, self.num_columns + 2) if precompute else None
+        start_x, start_y = self.start_point[0], self.start_point[1]
+        if self.__cells_terminal(np.array([start_x]), np.array([start_y]), terminal)[0]:
+            return self.__finish_training()
+        self.__stable_path, self.__stable_since = None, 0
+        next_check = self.check_interval
+
+        agents = min(agents, self.episodes)
+        x = np.full(agents, start_x)
+        y = np.full(agents, start_y)
+        episode = np.arange(agents)
+        active = np.ones(agents, dtype=bool)
+        started = agents
+
+        while active.any():
+            curr_x, curr_y = x[active], y[active]
+            q_values = q_table[curr_y + 1, curr_x + 1]
+            greedy = random.random(curr_x.shape[0]) < self.epsilon
+            action = np.where(greedy, np.argmax(q_values, axis=1), random.integers(8, size=curr_x.shape[0]))
+            next_x = curr_x + moves[action, 0]
+            next_y = curr_y + moves[action, 1]
+
+            if precompute:
+                reward = tables.reward[curr_y, curr_x, action]
+            else:
+                distance_diff = self.__goal_distance(curr_x, curr_y) - self.__goal_distance(next_x, next_y)
+                reward = move_reward[action] + self.goal_distance_reward * distance_diff + self.__cell_reward(next_x, next_y)
+
+            prev_q_value = q_values[np.arange(action.shape[0]), action]
+            temporal_difference = (
+                    reward +
+                    (self.discount_factor * np.max(q_table[next_y + 1, next_x + 1], axis=1)) -
+                    prev_q_value
+            )
+            q_table[curr_y + 1, curr_x + 1, action] = prev_q_value + self.learning_rate * temporal_difference
+
+            done = self.__cells_terminal(next_x, next_y, terminal)
+            reached_goal = done & (next_x == self.goal_point[0]) & (next_y == self.goal_point[1])
+            active_index = np.nonzero(active)[0]
+            if reached_goal.any() and self.first_goal_reached is None:
+                self.first_goal_reached = int(episode[active_index[reached_goal]].min())
+
+            x[active_index] = np.where(done, start_x, next_x)
+            y[active_index] = np.where(done, start_y, next_y)
+            for agent in active_index[done]:
+                if started < self.episodes:
+                    episode[agent] = started
+                    started += 1
+                else:
+                    active[agent] = False
+            self.episodes_trained = started
+            if self.patience is not None and started >= next_check:
+                next_check = started + self.check_interval
+                if self.__is_stable(tables, started):
+                    break
+            if self.episode_callback is not None and done.any() and self.episode_callback(started):
+                break
+        self.episode = started - 1
+        return self.__finish_training()
+
+    def __store_params(self):
+        # q_tables of the store are only shared between planners learning the same values
+        return (self.discount_factor, self.straight_move_reward, self.diagonal_move_reward,
+                self.goal_distance_reward, self.obstacle_hit_reward, self.goal_reach_reward,
+                self.bound_hit_reward)
+
+    def __finish_training(self):
+        if self.q_table_store is not None:
+            self.q_table_store.put(self.curr_map, self.goal_point, self.q_table, self.__store_params())
+        return self.episodes_trained
+
+    def __greedy_walk(self, tables):
+        """
+        Returns the states of the greedy path from the start state up to a terminal or an already visited state
+        """
+        num_padded_columns = self.num_columns + 2
+        next_state = tables.next_state.reshape(-1, 8)
+        q_table = self.q_table.reshape(-1, 8)
+        state = (self.start_point[1] + 1) * num_padded_columns + self.start_point[0] + 1
+        states = [state]
+        visited = {state}
+        # the greedy policy is deterministic, a path coming back to a state never ends
+        while not tables.terminal[state]:
+            cell = state - num_padded_columns - 2 * (state // num_padded_columns) + 1
+            state = next_state[cell, np.argmax(q_table[state])]
+            if state in visited:
+                break
+            visited.add(state)
+            states.append(state)
+        return states
+
+    def __greedy_states(self, tables):
+        """
+        Returns the states of the greedy path of get_path, or None if it does not reach the goal
+        """
+        goal_state = (self.goal_point[1] + 1) * (self.num_columns + 2) + self.goal_point[0] + 1
+        states = self.__greedy_walk(tables)
+        return tuple(states) if states[-1] == goal_state else None
+
+    def __is_stable(self, tables, episodes_trained):
+        """
+        Returns True once the greedy path reached the goal unchanged for patience episodes
+        """
+        path = self.__greedy_states(tables)
+        if path is None or path != self.__stable_path:
+            self.__stable_path = path
+            self.__stable_since = episodes_trained
+            return False
+        return episodes_trained - self.__stable_since >= self.patience
+
+    def __goal_distance(self, x, y):
+        return np.sqrt((x - self.goal_point[0]) ** 2 + (y - self.goal_point[1]) ** 2)
+
+    def __cell_reward(self, x, y):
+        out_of_bounds = (y >= self.num_rows) | (y < 0) | (x >= self.num_columns) | (x < 0)
+        inside_y = np.clip(y, 0, self.num_rows - 1)
+        inside_x = np.clip(x, 0, self.num_columns - 1)
+        obstacle = ~out_of_bounds & (self.curr_map[inside_y, inside_x] == 0)
+        goal = ~out_of_bounds & ~obstacle & (x == self.goal_point[0]) & (y == self.goal_point[1])
+        return np.select([out_of_bounds, obstacle, goal],
+                         [self.bound_hit_reward, self.obstacle_hit_reward, self.goal_reach_reward], 0)
+
+    def __cells_terminal(self, x, y, terminal=None):
+        if terminal is not None:
+            return terminal[y + 1, x + 1]
+        out_of_bounds = (y >= self.num_rows) | (y < 0) | (x >= self.num_columns) | (x < 0)
+        inside_y = np.clip(y, 0, self.num_rows - 1)
+        inside_x = np.clip(x, 0, self.num_columns - 1)
+        return out_of_bounds | (self.curr_map[inside_y, inside_x] == 0) | (
+                (x == self.goal_point[0]) & (y == self.goal_point[1]))
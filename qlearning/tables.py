@@ -0,0 +1,99 @@
+import hashlib
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+from Planners.util.cache import LRUCache, get_map_fingerprint
+
+# (dx, dy) of the actions of QLearningPathPlanner, in action order
+ACTIONS = np.array(((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)))
+
+_TABLE_CACHE = LRUCache(maxsize=8)
+
+
+class TransitionTables(NamedTuple):
+    """
+    Static Q-learning tables of a map and goal.
+
+    next_state and reward are (rows, cols, 8): the state reached and the reward received when
+    taking an action from a map cell. States are flat indices (y + 1) * (cols + 2) + (x + 1) of the
+    padded q_table grid, terminal flags every padded state that ends an episode.
+    """
+    next_state: np.ndarray
+    reward: np.ndarray
+    terminal: np.ndarray
+
+
+def get_cell_tables(curr_map, goal_point, obstacle_hit_reward=-100, goal_reach_reward=100, bound_hit_reward=-50):
+    """
+    Returns the static per-cell tables of the padded q_table grid:
+    goal distance, reward for entering the cell (bound, obstacle or goal) and terminal flag
+    """
+    num_rows, num_columns = curr_map.shape
+    padded_y, padded_x = np.mgrid[-1:num_rows + 1, -1:num_columns + 1]
+    goal_distance = np.sqrt((padded_x - goal_point[0]) ** 2 + (padded_y - goal_point[1]) ** 2)
+
+    out_of_bounds = np.ones((num_rows + 2, num_columns + 2), dtype=bool)
+    out_of_bounds[1:-1, 1:-1] = False
+    obstacle = np.zeros((num_rows + 2, num_columns + 2), dtype=bool)
+    obstacle[1:-1, 1:-1] = curr_map == 0
+    goal = (padded_x == goal_point[0]) & (padded_y == goal_point[1]) & ~out_of_bounds & ~obstacle
+
+    cell_reward = np.zeros((num_rows + 2, num_columns + 2))
+    cell_reward[out_of_bounds] = bound_hit_reward
+    cell_reward[obstacle] = obstacle_hit_reward
+    cell_reward[goal] = goal_reach_reward
+    return goal_distance, cell_reward, out_of_bounds | obstacle | goal
+
+
+def build_transition_tables(curr_map, goal_point, straight_move_reward=-1, diagonal_move_reward=-(2 ** 0.5),
+                            goal_distance_reward=1, obstacle_hit_reward=-100, goal_reach_reward=100,
+                            bound_hit_reward=-50):
+    """
+    Builds the next state, reward and terminal tables of QLearningPathPlanner for a map and goal.
+    The rewards are computed with the same arithmetic as QLearningPathPlanner.get_reward.
+    """
+    num_rows, num_columns = curr_map.shape
+    goal_distance, cell_reward, terminal = get_cell_tables(
+        curr_map, goal_point, obstacle_hit_reward, goal_reach_reward, bound_hit_reward)
+
+    cell_y, cell_x = np.mgrid[0:num_rows, 0:num_columns]
+    next_x = cell_x[..., None] + ACTIONS[:, 0] + 1
+    next_y = cell_y[..., None] + ACTIONS[:, 1] + 1
+    move_distance = np.sqrt(ACTIONS[:, 0] ** 2 + ACTIONS[:, 1] ** 2)
+    move_reward = np.where(move_distance == 1, straight_move_reward, diagonal_move_reward)
+
+    distance_diff = goal_distance[cell_y + 1, cell_x + 1][..., None] - goal_distance[next_y, next_x]
+    reward = move_reward + goal_distance_reward * distance_diff + cell_reward[next_y, next_x]
+    next_state = next_y * (num_columns + 2) + next_x
+    return TransitionTables(next_state, reward, terminal.ravel())
+
+
+def get_transition_tables(curr_map, goal_point, cache_dir=None, **rewards):
+    """
+    Returns the transition tables of a map and goal, shared by every planner with the same map,
+    goal and rewards through an in-memory cache and, if cache_dir is given, an .npz file cache
+
+    Args:
+        curr_map (array): array of pixels containing obstacles
+        goal_point (tuple): goal position
+        cache_dir (str): directory of the .npz cache
+        rewards: reward arguments of build_transition_tables
+    """
+    goal_point = tuple(int(value) for value in goal_point)
+    key = (get_map_fingerprint(curr_map), goal_point, tuple(sorted(rewards.items())))
+
+    def load_or_build():
+        if cache_dir is None:
+            return build_transition_tables(curr_map, goal_point, **rewards)
+        file_name = os.path.join(cache_dir, 'qtables_%s.npz' % hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest())
+        if os.path.exists(file_name):
+            with np.load(file_name) as data:
+                return TransitionTables(data['next_state'], data['reward'], data['terminal'])
+        tables = build_transition_tables(curr_map, goal_point, **rewards)
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez_compressed(file_name, **tables._asdict())
+        return tables
+
+    return _TABLE_CACHE.get_or_create(key, load_or_build)